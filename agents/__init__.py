@@ -0,0 +1,72 @@
+"""Ground Control agents - lazy registry and a single dispatch entry point
+
+Agent modules (and ``openai``) are only imported when an agent is first used::
+
+    from agents import dispatch
+    dispatch("finance", "Cash runway at ZEC 4%?", {"zec_rate": 4})
+"""
+import importlib
+from typing import Dict, Any, Optional, Callable, List
+
+# Agent name -> module implementing run_<name>, arun_<name> and stream_<name>
+REGISTRY: Dict[str, str] = {
+    "ghc_dt": "agents.ghc_dt",
+    "finance": "agents.finance",
+    "strategy": "agents.strategy",
+    "market": "agents.market",
+    "risk": "agents.risk",
+    "compliance": "agents.compliance",
+    "operations": "agents.operations",
+    "code": "agents.code",
+    "innovation": "agents.innovation",
+}
+
+MODES = ("run", "arun", "stream")
+
+
+def register(name: str, module: str) -> None:
+    """Add (or replace) an agent; ``module`` must define run_<name>, arun_<name> and stream_<name>"""
+    REGISTRY[name] = module
+
+
+def available() -> List[str]:
+    """Names of all registered agents"""
+    return list(REGISTRY)
+
+
+def agent_module(name: str):
+    """Import (once) and return the module behind an agent"""
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown agent: {name}")
+    return importlib.import_module(REGISTRY[name])
+
+
+def get_agent(name: str, mode: str = "run") -> Callable:
+    """The run/arun/stream callable of an agent"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    return getattr(agent_module(name), f"{mode}_{name}")
+
+
+def dispatch(agent: str, question: str, state: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """Answer a question with the named agent"""
+    return get_agent(agent)(question, state, **kwargs)
+
+
+async def adispatch(agent: str, question: str, state: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """Async version of dispatch"""
+    return await get_agent(agent, "arun")(question, state, **kwargs)
+
+
+def stream(agent: str, question: str, state: Optional[Dict[str, Any]] = None, **kwargs):
+    """Streaming version of dispatch; returns an AgentStream"""
+    return get_agent(agent, "stream")(question, state, **kwargs)
+
+
+def __getattr__(attribute: str):
+    # Lazy `from agents import run_finance` style access
+    for mode in MODES:
+        name = attribute[len(mode) + 1:]
+        if attribute.startswith(mode + "_") and name in REGISTRY:
+            return get_agent(name, mode)
+    raise AttributeError(f"module {__name__!r} has no attribute {attribute!r}")
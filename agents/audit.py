@@ -0,0 +1,299 @@
+"""Audit trail - lazy reader and on-disk index over the evidence log"""
+import os
+import re
+import gzip
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Iterator, Iterable, Union
+from datetime import date
+
+_TERM = re.compile(r"[a-z0-9]+")
+
+# Bump when the way entries are indexed changes; older indexes are rebuilt
+INDEX_VERSION = 2
+
+
+def _terms(text: str) -> List[str]:
+    return sorted(set(_TERM.findall(text.lower())))
+
+
+def _iso(value: Union[str, date, None]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def log_files(path: str) -> List[str]:
+    """Evidence log files oldest first: rotated backups (<path>.N[.gz]) then the active file"""
+    directory, base = os.path.split(os.path.abspath(path))
+    pattern = re.compile(re.escape(base) + r"\.(\d+)(\.gz)?")
+    backups = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            match = pattern.fullmatch(name)
+            if match:
+                backups.append((int(match.group(1)), os.path.join(directory, name)))
+    files = [file for _, file in sorted(backups, reverse=True)]
+    if os.path.exists(path):
+        files.append(os.path.abspath(path))
+    return files
+
+
+def iter_entries(path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream every entry of the evidence log, oldest first, without loading it into memory"""
+    path = path or os.getenv("GHC_DT_EVIDENCE_LOG")
+    if not path:
+        return
+    for file in log_files(path):
+        with _open(file) as f:
+            for line in f:
+                if line.endswith(b"\n"):  # skip a line the writer has not finished
+                    yield json.loads(line)
+
+
+def _segment_id(path: str) -> Optional[str]:
+    # A segment keeps its identity (hash of its first line) through rotation and gzip
+    with _open(path) as f:
+        first = f.readline()
+    return hashlib.sha1(first).hexdigest() if first.endswith(b"\n") else None
+
+
+def _read_lines(path: str, offsets: Iterable[int]) -> Dict[int, bytes]:
+    """Lines starting at the given (uncompressed) byte offsets, read in one sequential pass
+
+    Seeking in a gzip file decompresses it from the start on every backward
+    seek, so compressed segments are read this way instead.
+    """
+    wanted, found, position = set(offsets), {}, 0
+    last = max(wanted, default=-1)
+    with _open(path) as f:
+        for line in f:
+            if position > last:
+                break
+            if position in wanted:
+                found[position] = line
+            position += len(line)
+    return found
+
+
+def read_new(path: str, progress: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    """Entries appended since ``progress`` (segment id -> byte offset), which is updated in place"""
+    segments = set()
+    for file in log_files(path):
+        segment = _segment_id(file)
+        if segment is None:
+            continue
+        segments.add(segment)
+        offset = progress.get(segment, 0)
+        with _open(file) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                progress[segment] = offset
+                yield json.loads(line)
+    for segment in set(progress) - segments:  # rotated out of the log
+        del progress[segment]
+
+
+class EvidenceIndex:
+    """SQLite index of evidence entries by timestamp, agent and keyword
+
+    The index stores each entry's byte offset inside its log segment, so queries
+    only read the matching lines (gzipped segments in one pass per query, as they
+    cannot seek cheaply). ``update`` indexes new lines incrementally; rotated
+    segments are indexed once and never re-read.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, index_path: Optional[str] = None):
+        self.log_path = log_path or os.getenv("GHC_DT_EVIDENCE_LOG")
+        if not self.log_path:
+            raise ValueError("GHC_DT_EVIDENCE_LOG is not configured")
+        self.index_path = index_path or os.getenv("GHC_DT_EVIDENCE_INDEX") or self.log_path + ".idx"
+        self._files: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            # Built by an older version (e.g. without short terms): index the log again
+            self._db.executescript("""
+                DROP TABLE IF EXISTS terms;
+                DROP TABLE IF EXISTS entries;
+                DROP TABLE IF EXISTS segments;
+            """)
+            self._db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS segments (
+                id TEXT PRIMARY KEY, indexed_offset INTEGER NOT NULL, complete INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY, segment TEXT NOT NULL, offset INTEGER NOT NULL,
+                timestamp TEXT NOT NULL, agent TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+            CREATE INDEX IF NOT EXISTS entries_agent ON entries (agent, timestamp);
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT NOT NULL, entry INTEGER NOT NULL, PRIMARY KEY (term, entry)
+            ) WITHOUT ROWID;
+        """)
+
+    def update(self) -> int:
+        """Index lines appended since the last update; returns the number of new entries"""
+        with self._lock:
+            added = 0
+            files: Dict[str, str] = {}
+            active = os.path.abspath(self.log_path)
+            for file in log_files(self.log_path):
+                segment = _segment_id(file)
+                if segment is None:
+                    continue
+                files[segment] = file
+                row = self._db.execute(
+                    "SELECT indexed_offset, complete FROM segments WHERE id = ?", (segment,)
+                ).fetchone()
+                if row and row[1]:
+                    continue
+                offset = row[0] if row else 0
+                with _open(file) as f:
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        self._add(segment, offset, json.loads(line))
+                        offset += len(line)
+                        added += 1
+                self._db.execute(
+                    "INSERT OR REPLACE INTO segments (id, indexed_offset, complete) VALUES (?, ?, ?)",
+                    (segment, offset, int(file != active))
+                )
+
+            # Segments dropped by rotation are no longer readable
+            for (segment,) in self._db.execute("SELECT id FROM segments").fetchall():
+                if segment not in files:
+                    self._db.execute(
+                        "DELETE FROM terms WHERE entry IN (SELECT id FROM entries WHERE segment = ?)", (segment,)
+                    )
+                    self._db.execute("DELETE FROM entries WHERE segment = ?", (segment,))
+                    self._db.execute("DELETE FROM segments WHERE id = ?", (segment,))
+            self._db.commit()
+            self._files = files
+            return added
+
+    def _add(self, segment: str, offset: int, entry: Dict[str, Any]) -> None:
+        cursor = self._db.execute(
+            "INSERT INTO entries (segment, offset, timestamp, agent) VALUES (?, ?, ?, ?)",
+            (segment, offset, entry.get("timestamp", ""), entry.get("agent", ""))
+        )
+        text = f"{entry.get('question', '')} {entry.get('answer', '')}"
+        self._db.executemany(
+            "INSERT OR IGNORE INTO terms (term, entry) VALUES (?, ?)",
+            [(term, cursor.lastrowid) for term in _terms(text)]
+        )
+
+    def _where(self, agent: Optional[str], start: Union[str, date, None], end: Union[str, date, None],
+               keywords: Optional[Iterable[str]]):
+        clauses, params = [], []
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(_iso(start))
+        if end:
+            clauses.append("timestamp < ?")
+            params.append(_iso(end))
+        keywords = [keyword for keyword in keywords or [] if keyword.strip()]
+        terms = _terms(" ".join(keywords))
+        if keywords and not terms:
+            raise ValueError(f"Keywords {keywords!r} contain no searchable terms")
+        for term in terms:
+            clauses.append("id IN (SELECT entry FROM terms WHERE term = ?)")
+            params.append(term)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, agent: Optional[str] = None, start: Union[str, date, None] = None,
+              end: Union[str, date, None] = None, keywords: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None, newest_first: bool = False,
+              refresh: bool = True) -> Iterator[Dict[str, Any]]:
+        """Entries matching every filter; ``end`` is exclusive and keywords are ANDed
+
+        e.g. ``query(agent="ghc_dt", keywords=["zec"], start="2025-07-01", end="2025-10-01")``
+        """
+        if refresh:
+            self.update()
+        where, params = self._where(agent, start, end, keywords)
+        sql = f"SELECT segment, offset FROM entries{where} ORDER BY timestamp {'DESC' if newest_first else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            files = dict(self._files)
+        offsets: Dict[str, List[int]] = {}
+        for segment, offset in rows:
+            offsets.setdefault(segment, []).append(offset)
+
+        handles: Dict[str, Any] = {}
+        lines: Dict[str, Dict[int, bytes]] = {}
+        try:
+            for segment, offset in rows:
+                if segment not in handles and segment not in lines:
+                    path = self._locate(segment, files)
+                    if path is None:
+                        lines[segment] = {}  # rotated out of the log since it was indexed
+                    elif path.endswith(".gz"):
+                        lines[segment] = _read_lines(path, offsets[segment])
+                    else:
+                        handles[segment] = open(path, "rb")
+                if segment in lines:
+                    line = lines[segment].pop(offset, None)
+                    if line is not None:
+                        yield json.loads(line)
+                    continue
+                f = handles[segment]
+                f.seek(offset)
+                yield json.loads(f.readline())
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def _locate(self, segment: str, files: Dict[str, str]) -> Optional[str]:
+        # The file holding a segment, which may have been renamed (or gzipped) by rotation since the last update
+        path = files.get(segment)
+        if path is not None and os.path.exists(path) and _segment_id(path) == segment:
+            return path
+        for file in log_files(self.log_path):
+            if _segment_id(file) == segment:
+                files[segment] = file
+                return file
+        return None
+
+    def count(self, agent: Optional[str] = None, start: Union[str, date, None] = None,
+              end: Union[str, date, None] = None, keywords: Optional[Iterable[str]] = None) -> int:
+        """Number of matching entries, answered from the index alone"""
+        self.update()
+        where, params = self._where(agent, start, end, keywords)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM entries{where}", params).fetchone()[0]
+
+    def export_parquet(self, out_path: str, **filters) -> int:
+        """Write matching entries to a Parquet file (requires pandas + pyarrow); returns the row count"""
+        import pandas as pd
+
+        frame = pd.DataFrame(list(self.query(**filters)))
+        if not frame.empty:
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+            for column in ("agent", "model"):
+                if column in frame:
+                    frame[column] = frame[column].astype("category")
+        frame.to_parquet(out_path, index=False)
+        return len(frame)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,80 @@
+"""Batch runner - many questions through one agent with bounded parallelism"""
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Sequence
+
+from . import agent_module
+from .client import get_model, get_temperature
+from .runtime import complete, messages, failed, unconfigured_result
+
+
+def _system_prompt(agent: str, state: Optional[Dict[str, Any]]) -> str:
+    return agent_module(agent).system_prompt(state)
+
+
+def _ask(agent: str, system_prompt: str, question: str, max_retries: int, backoff: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        return complete(agent, system_prompt, question, retries=max_retries, backoff=backoff, fallback=True)
+    except Exception as e:
+        return failed(agent, e, started)
+
+
+def run_batch(agent: str, questions: Sequence[str], state: Optional[Dict[str, Any]] = None,
+              max_workers: Optional[int] = None, max_retries: int = 5,
+              backoff: float = 1.0) -> Dict[str, Any]:
+    """Answer many questions with one agent, preserving input order
+
+    Calls run on a thread pool (AGENTS_BATCH_WORKERS, default 8) through the
+    resilient call pipeline, which retries rate limits and other transient errors
+    with jittered exponential backoff. Returns per-item ``results`` and
+    aggregate ``meta`` with token and latency totals.
+    """
+    system_prompt = _system_prompt(agent, state)
+    started = time.perf_counter()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        results = [unconfigured_result(agent) for _ in questions]
+    else:
+        workers = max_workers or int(os.getenv("AGENTS_BATCH_WORKERS", "8"))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda question: _ask(agent, system_prompt, question, max_retries, backoff),
+                questions
+            ))
+
+    return {
+        "results": results,
+        "meta": {
+            "agent": agent,
+            "count": len(results),
+            "errors": sum(1 for result in results if result["meta"].get("error")),
+            "cached": sum(1 for result in results if result["meta"].get("cached")),
+            "tokens": sum(result["meta"]["tokens"] for result in results),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "call_latency_ms": round(sum(result["meta"].get("latency_ms", 0) for result in results), 1),
+        }
+    }
+
+
+def write_batch_file(agent: str, questions: Sequence[str], path: str,
+                     state: Optional[Dict[str, Any]] = None) -> str:
+    """Write the questions as an OpenAI Batch API input file (JSONL) for bulk submission"""
+    system_prompt = _system_prompt(agent, state)
+    model, temperature = get_model(agent), get_temperature(agent)
+    with open(path, "w") as f:
+        for index, question in enumerate(questions):
+            request = {
+                "custom_id": f"{agent}-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "temperature": temperature,
+                    "messages": messages(system_prompt, question)
+                }
+            }
+            f.write(json.dumps(request) + "\n")
+    return path
@@ -0,0 +1,145 @@
+"""Response cache - in-memory LRU with TTL and an optional on-disk tier for agent answers"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+def cache_key(agent: str, model: str, temperature: float, system_prompt: str, question: str) -> str:
+    """Stable key for one agent call; the rendered system prompt carries the state"""
+    payload = json.dumps([agent, model, temperature, system_prompt, question], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache with per-entry TTL, backed by SQLite when ``path`` is given
+
+    Expired entries are kept for another ``stale_ttl`` seconds so ``get(key, stale=True)``
+    can still serve them while the model is unavailable.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0, path: Optional[str] = None,
+                 stale_ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str, stale: bool = False) -> Optional[Dict[str, Any]]:
+        """Value for ``key``; ``stale`` also accepts entries expired less than ``stale_ttl`` ago"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now or (stale and expires + self.stale_ttl > now):
+                    self._entries.move_to_end(key)
+                    return value
+                if expires + self.stale_ttl <= now:
+                    del self._entries[key]
+                return None
+
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.stale_ttl <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            if row[1] <= now and not stale:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires)
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key: str, expires: float, value: Dict[str, Any]) -> None:
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_lock = threading.Lock()
+_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Process-wide cache configured from AGENTS_CACHE_* (None when AGENTS_CACHE=0)"""
+    global _cache
+    if os.getenv("AGENTS_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    with _lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                max_entries=int(os.getenv("AGENTS_CACHE_SIZE", "512")),
+                ttl=float(os.getenv("AGENTS_CACHE_TTL", "3600")),
+                path=os.getenv("AGENTS_CACHE_PATH") or None,
+                stale_ttl=float(os.getenv("AGENTS_CACHE_STALE_TTL", "86400")),
+            )
+    return _cache
+
+
+def cacheable(temperature: float) -> bool:
+    """Only near-deterministic calls are cached (AGENTS_CACHE_MAX_TEMPERATURE, default 0.5)"""
+    return temperature <= float(os.getenv("AGENTS_CACHE_MAX_TEMPERATURE", "0.5"))
+
+
+def lookup(key: str, temperature: float) -> Optional[Dict[str, Any]]:
+    """Cached result for ``key``, marked with meta['cached'] and zero tokens spent"""
+    cache = get_cache()
+    if cache is None or not cacheable(temperature):
+        return None
+    value = cache.get(key)
+    if value is None:
+        return None
+    return {"answer": value["answer"], "meta": {**value["meta"], "tokens": 0, "cached": True}}
+
+
+def stale_lookup(key: str) -> Optional[Dict[str, Any]]:
+    """Last known result for ``key`` even if expired, used when the model is unavailable"""
+    cache = get_cache()
+    value = cache.get(key, stale=True) if cache is not None else None
+    if value is None:
+        return None
+    return {"answer": value["answer"], "meta": {**value["meta"], "tokens": 0, "cached": True, "stale": True}}
+
+
+def store(key: str, temperature: float, result: Dict[str, Any]) -> None:
+    """Remember a successful result"""
+    cache = get_cache()
+    if cache is None or not cacheable(temperature) or result["meta"].get("error"):
+        return
+    cache.set(key, {"answer": result["answer"], "meta": dict(result["meta"])})
@@ -0,0 +1,179 @@
+"""Shared LLM client - pooled OpenAI connections and model settings for all agents"""
+import os
+import asyncio
+import threading
+import weakref
+import contextvars
+from typing import Dict, Any, Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Default sampling temperature per agent (overridable with <AGENT>_TEMPERATURE)
+AGENT_TEMPERATURES = {
+    "ghc_dt": 0.2,
+    "finance": 0.2,
+    "strategy": 0.3,
+    "market": 0.3,
+    "risk": 0.2,
+    "compliance": 0.1,
+    "code": 0.3,
+    "operations": 0.3,
+    "innovation": 0.7,
+}
+
+_lock = threading.Lock()
+_clients: Dict[str, Any] = {}
+# Async clients are bound to the event loop that created their connections
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+# Event loop on a daemon thread that sync callers use for async work, so its async clients are reused
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def get_model(agent: str) -> str:
+    """Model for an agent: <AGENT>_MODEL, then AGENTS_MODEL, then the default"""
+    return os.getenv(f"{agent.upper()}_MODEL") or os.getenv("AGENTS_MODEL") or DEFAULT_MODEL
+
+
+def get_temperature(agent: str) -> float:
+    """Temperature for an agent: <AGENT>_TEMPERATURE, then AGENTS_TEMPERATURE, then the agent default"""
+    value = os.getenv(f"{agent.upper()}_TEMPERATURE") or os.getenv("AGENTS_TEMPERATURE")
+    return float(value) if value else AGENT_TEMPERATURES.get(agent, 0.3)
+
+
+def pool_settings() -> Dict[str, Any]:
+    """Connection pool and timeout settings read from the environment"""
+    return {
+        "max_connections": _env_int("AGENTS_MAX_CONNECTIONS", 20),
+        "max_keepalive_connections": _env_int("AGENTS_MAX_KEEPALIVE", 10),
+        "keepalive_expiry": _env_float("AGENTS_KEEPALIVE_EXPIRY", 30.0),
+        "timeout": _env_float("AGENTS_TIMEOUT", 60.0),
+        "connect_timeout": _env_float("AGENTS_CONNECT_TIMEOUT", 5.0),
+    }
+
+
+def _http_options() -> Dict[str, Any]:
+    import httpx
+
+    settings = pool_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        "timeout": httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+    }
+
+
+def get_client(api_key: Optional[str] = None):
+    """Process-wide OpenAI client with a keep-alive connection pool, one per API key"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            import httpx
+            from openai import OpenAI
+
+            options = _http_options()
+            client = OpenAI(
+                api_key=api_key,
+                timeout=options["timeout"],
+                max_retries=0,  # retries are handled by agents.resilience
+                http_client=httpx.Client(**options),
+            )
+            _clients[api_key] = client
+    return client
+
+
+def get_async_client(api_key: Optional[str] = None):
+    """Pooled AsyncOpenAI client for the running event loop, one per API key"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            options = _http_options()
+            client = AsyncOpenAI(
+                api_key=api_key,
+                timeout=options["timeout"],
+                max_retries=0,  # retries are handled by agents.resilience
+                http_client=httpx.AsyncClient(**options),
+            )
+            clients[api_key] = client
+    return client
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running on a daemon thread, started on first use"""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="agents-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+async def _in_context(awaitable: Awaitable[T], context: contextvars.Context) -> T:
+    # Carry the caller's context variables (session, tenant) over to the loop thread
+    for var, value in context.items():
+        var.set(value)
+    return await awaitable
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine on the background loop and wait for its result
+
+    Unlike ``asyncio.run`` this keeps one loop, and so one pooled AsyncOpenAI
+    client, for every sync call in the process.
+    """
+    loop = background_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("run_sync called from the agents event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(_in_context(awaitable, contextvars.copy_context()), loop).result()
+
+
+def _aclose(loop: asyncio.AbstractEventLoop, client) -> None:
+    if loop.is_closed():
+        return
+    if loop.is_running():
+        if threading.current_thread() is not _loop_thread:
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+    else:
+        loop.run_until_complete(client.close())
+
+
+def close_clients() -> None:
+    """Close pooled connections (e.g. on shutdown or after rotating keys)"""
+    with _lock:
+        clients = list(_clients.values())
+        async_clients = [(loop, client) for loop, pooled in _async_clients.items() for client in pooled.values()]
+        _clients.clear()
+        _async_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+    for loop, client in async_clients:
+        try:
+            _aclose(loop, client)
+        except Exception:
+            pass
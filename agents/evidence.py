@@ -0,0 +1,216 @@
+"""Evidence log - buffered JSONL audit trail of agent answers written off the request thread"""
+import os
+import gzip
+import json
+import hashlib
+import time
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Backoff between attempts to write lines that failed to reach disk
+RETRY_MIN = 0.5
+RETRY_MAX = 30.0
+
+
+class EvidenceLog:
+    """Background JSONL writer with batched flushes and size-based rotation
+
+    Entries are queued by ``write`` and appended by a single writer thread once
+    ``batch_size`` entries are pending or ``flush_interval`` seconds have passed.
+    When the file exceeds ``max_bytes`` it is rotated to ``<path>.1`` (gzipped to
+    ``<path>.1.gz`` with ``compress``), keeping ``backups`` old files.
+
+    Lines that fail to reach disk are kept and retried with exponential backoff.
+    At most ``max_pending`` are kept; older ones beyond that are dropped and
+    counted in ``dropped``.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50_000_000, backups: int = 5,
+                 compress: bool = False, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_pending: int = 10_000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._file = None
+        self._pending: List[str] = []
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="evidence-log", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Queue one entry; never blocks on disk"""
+        with self._lock:
+            if self._closed:
+                raise ValueError("Evidence log is closed")
+            self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; returns False if the timeout expired"""
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return True  # close() already wrote everything
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Drain the queue, write the remaining entries and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        batch: List[str] = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = threading.Event()  # time threshold reached: flush what we have
+
+            if isinstance(item, dict):
+                batch.append(json.dumps(item) + "\n")
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch or self._pending:
+                self._write_batch(batch, force=item is None)
+                batch = []
+            if item is None:
+                if self._pending:
+                    self._drop(len(self._pending))
+                if self._file is not None:
+                    self._file.close()
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write_batch(self, lines: List[str], force: bool = False) -> None:
+        self._pending.extend(lines)
+        if len(self._pending) > self.max_pending:
+            self._drop(len(self._pending) - self.max_pending)
+        if not force and time.monotonic() < self._retry_at:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.writelines(self._pending)
+            self._file.flush()
+            self._pending = []
+            self._backoff = 0.0
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            # Audit logging must never take an agent down; keep the lines and retry later
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+            self._backoff = min(max(self._backoff * 2, RETRY_MIN), RETRY_MAX)
+            self._retry_at = time.monotonic() + self._backoff
+            logger.warning("Evidence log write to %s failed; retrying in %.1fs", self.path,
+                           self._backoff, exc_info=True)
+
+    def _drop(self, count: int) -> None:
+        del self._pending[:count]
+        self.dropped += count
+        logger.error("Evidence log %s dropped %d entries (%d in total)", self.path, count, self.dropped)
+
+    def _backup(self, index: int) -> str:
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(self._backup(index)):
+                os.replace(self._backup(index), self._backup(index + 1))
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(self._backup(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self._backup(1))
+
+
+_lock = threading.Lock()
+_logs: Dict[str, EvidenceLog] = {}
+
+
+def get_log() -> Optional[EvidenceLog]:
+    """Shared writer for GHC_DT_EVIDENCE_LOG (None when evidence logging is off)"""
+    path = os.getenv("GHC_DT_EVIDENCE_LOG")
+    if not path:
+        return None
+    with _lock:
+        log = _logs.get(path)
+        if log is None:
+            log = EvidenceLog(
+                path,
+                max_bytes=int(os.getenv("GHC_DT_EVIDENCE_MAX_BYTES", "50000000")),
+                backups=int(os.getenv("GHC_DT_EVIDENCE_BACKUPS", "5")),
+                compress=os.getenv("GHC_DT_EVIDENCE_GZIP", "0").lower() in ("1", "true", "yes"),
+                batch_size=int(os.getenv("GHC_DT_EVIDENCE_BATCH", "100")),
+                flush_interval=float(os.getenv("GHC_DT_EVIDENCE_FLUSH_INTERVAL", "1.0")),
+                max_pending=int(os.getenv("GHC_DT_EVIDENCE_MAX_PENDING", "10000")),
+            )
+            _logs[path] = log
+    return log
+
+
+def prompt_hash(system_prompt: str) -> str:
+    """Short stable fingerprint of a system prompt (and so of the state rendered into it)"""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def record(question: str, result: Dict[str, Any], system_prompt: Optional[str] = None) -> None:
+    """Append a successful agent answer to the evidence log, if one is configured"""
+    meta = result["meta"]
+    if meta.get("error"):
+        return
+    log = get_log()
+    if log is None:
+        return
+    log.write({
+        "timestamp": datetime.utcnow().isoformat(),
+        "agent": meta["agent"],
+        "model": meta.get("model"),
+        "question": question,
+        "prompt_hash": prompt_hash(system_prompt) if system_prompt is not None else None,
+        "answer": result["answer"],
+        "tokens": meta["tokens"],
+        "prompt_tokens": meta.get("prompt_tokens", 0),
+        "completion_tokens": meta.get("completion_tokens", 0),
+        "latency_ms": meta.get("latency_ms"),
+        "cached": bool(meta.get("cached")),
+    })
+
+
+@atexit.register
+def close_all() -> None:
+    """Flush and close every evidence log (runs automatically at interpreter exit)"""
+    with _lock:
+        logs = list(_logs.values())
+        _logs.clear()
+    for log in logs:
+        log.close()
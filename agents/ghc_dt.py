@@ -1,69 +1,173 @@
 """CEO Digital Twin (ghc_dt) - Executive orchestrator"""
 import os
 import json
-from datetime import datetime
-from typing import Dict, Any, Optional
-from openai import OpenAI
-
-def run_ghc_dt(question: str, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """CEO Digital Twin orchestrator implementation"""
-    # Get configuration
-    model = os.getenv("GHC_DT_MODEL", "gpt-4o-mini")
-    temperature = float(os.getenv("GHC_DT_TEMPERATURE", "0.2"))
-    evidence_log = os.getenv("GHC_DT_EVIDENCE_LOG")
-    
-    # Get system prompt
-    default_prompt = """You are GHC-DT, the CEO Digital Twin of Green Hill Canarias.
+import asyncio
+from typing import Dict, Any, Callable, Optional, Sequence, List
+from . import REGISTRY, get_agent
+from .client import run_sync
+from .runtime import run_agent, arun_agent, stream_agent, AgentStream
+
+AGENT = "ghc_dt"
+
+# Sub-agents the CEO twin consults when no explicit list is given
+SUBAGENTS = ("finance", "strategy", "market", "risk", "compliance", "operations", "code", "innovation")
+
+DEFAULT_PROMPT = """You are GHC-DT, the CEO Digital Twin of Green Hill Canarias.
 You orchestrate between agents and provide executive-level insights.
 Your style is operational, rational, and focused on execution.
 Current context: {context}"""
-    
-    system_prompt = os.getenv("GHC_DT_SYSTEM_PROMPT", default_prompt)
-    
-    # Initialize OpenAI
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return {
-            "answer": "OPENAI_API_KEY not configured",
-            "meta": {"agent": "ghc_dt", "tokens": 0}
-        }
-    
-    client = OpenAI(api_key=api_key)
+
+
+def system_prompt(state: Optional[Dict[str, Any]] = None) -> str:
+    """System prompt for the CEO twin (GHC_DT_SYSTEM_PROMPT overrides the default)"""
     state = state or {}
-    
-    # Build context
     context = json.dumps({
         "phase": state.get("phase", "Phase 1"),
         "zec_rate": state.get("zec_rate", 4),
         "cash_buffer_to": state.get("cash_buffer_to", "2026-06-30")
     })
-    
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            messages=[
-                {"role": "system", "content": system_prompt.format(context=context)},
-                {"role": "user", "content": question}
-            ]
-        )
-        
-        answer = response.choices[0].message.content
-        tokens = response.usage.total_tokens
-        
-        # Log to evidence if configured
-        if evidence_log:
-            entry = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "agent": "ghc_dt",
-                "question": question,
-                "answer": answer,
-                "tokens": tokens
+    return os.getenv("GHC_DT_SYSTEM_PROMPT", DEFAULT_PROMPT).format(context=context)
+
+
+def _configured_agents() -> List[str]:
+    """Sub-agents consulted by default (GHC_DT_AGENTS, comma separated)"""
+    return [name.strip() for name in os.getenv("GHC_DT_AGENTS", "").split(",") if name.strip()]
+
+
+def _with_briefings(prompt: str, briefings: Dict[str, Dict[str, Any]]) -> str:
+    sections = [
+        f"[{name}] {result['answer']}"
+        for name, result in briefings.items()
+        if not result["meta"].get("error")
+    ]
+    if not sections:
+        return prompt
+    return (
+        prompt
+        + "\n\nBriefings from your agents:\n"
+        + "\n\n".join(sections)
+        + "\n\nCombine these briefings into a single executive answer."
+    )
+
+
+async def _consult(name: str, question: str, state: Optional[Dict[str, Any]],
+                   timeout: float, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    runner = get_agent(name, "arun")
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(runner(question, state), timeout)
+        except asyncio.TimeoutError:
+            return {
+                "answer": f"Error: timed out after {timeout:g}s",
+                "meta": {"agent": name, "tokens": 0, "error": "timeout"}
             }
-            with open(evidence_log, "a") as f:
-                f.write(json.dumps(entry) + "\n")
-        
-        return {"answer": answer, "meta": {"agent": "ghc_dt", "tokens": tokens}}
-    
-    except Exception as e:
-        return {"answer": f"Error: {str(e)}", "meta": {"agent": "ghc_dt", "tokens": 0}}
+
+
+async def abrief(question: str, state: Optional[Dict[str, Any]] = None,
+                 agents: Optional[Sequence[str]] = None,
+                 timeout: Optional[float] = None,
+                 max_concurrency: Optional[int] = None,
+                 on_briefing: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+    """Ask sub-agents concurrently and return their results by agent name
+
+    ``timeout`` applies to each sub-agent call (GHC_DT_AGENT_TIMEOUT, default 30s) and
+    ``max_concurrency`` caps calls in flight (GHC_DT_MAX_CONCURRENCY, default 4).
+    ``on_briefing(name, result)`` is called as each sub-agent answers; if it raises,
+    the remaining calls are cancelled.
+    """
+    names = list(agents) if agents is not None else list(SUBAGENTS)
+    unknown = [name for name in names if name not in REGISTRY or name == AGENT]
+    if unknown:
+        raise ValueError(f"Unknown agents: {', '.join(unknown)}")
+
+    timeout = timeout or float(os.getenv("GHC_DT_AGENT_TIMEOUT", "30"))
+    semaphore = asyncio.Semaphore(max_concurrency or int(os.getenv("GHC_DT_MAX_CONCURRENCY", "4")))
+
+    async def consult(name: str) -> Dict[str, Any]:
+        result = await _consult(name, question, state, timeout, semaphore)
+        if on_briefing:
+            on_briefing(name, result)
+        return result
+
+    tasks = [asyncio.ensure_future(consult(name)) for name in names]
+    try:
+        answers = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return dict(zip(names, answers))
+
+
+def _merge_briefings(result: Dict[str, Any], briefings: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    if briefings:
+        result["meta"]["agents"] = {name: answer["meta"] for name, answer in briefings.items()}
+        result["meta"]["tokens"] += sum(answer["meta"]["tokens"] for answer in briefings.values())
+    return result
+
+
+async def aorchestrate(question: str, state: Optional[Dict[str, Any]] = None,
+                       agents: Optional[Sequence[str]] = None,
+                       timeout: Optional[float] = None,
+                       max_concurrency: Optional[int] = None,
+                       prompt: Optional[str] = None,
+                       on_briefing: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Ask sub-agents concurrently, then let the CEO twin combine their answers
+
+    ``prompt`` replaces the CEO twin's system prompt (e.g. a session prompt with history).
+    """
+    briefings = await abrief(question, state, agents, timeout, max_concurrency, on_briefing)
+    result = await arun_agent(AGENT, _with_briefings(prompt or system_prompt(state), briefings), question)
+    return _merge_briefings(result, briefings)
+
+
+def orchestrate(question: str, state: Optional[Dict[str, Any]] = None,
+                agents: Optional[Sequence[str]] = None,
+                timeout: Optional[float] = None,
+                max_concurrency: Optional[int] = None,
+                prompt: Optional[str] = None,
+                on_briefing: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Blocking wrapper around aorchestrate for sync callers (runs on the shared agents event loop)"""
+    return run_sync(aorchestrate(question, state, agents, timeout, max_concurrency, prompt, on_briefing))
+
+
+def run_ghc_dt(question: str, state: Optional[Dict[str, Any]] = None,
+               agents: Optional[Sequence[str]] = None, prompt: Optional[str] = None) -> Dict[str, Any]:
+    """CEO Digital Twin orchestrator implementation
+
+    With ``agents`` (or GHC_DT_AGENTS) set, the question is fanned out to those
+    sub-agents concurrently before the CEO twin answers. ``prompt`` replaces the
+    system prompt rendered from ``state``.
+    """
+    agents = _configured_agents() if agents is None else agents
+    if agents:
+        return orchestrate(question, state, agents, prompt=prompt)
+    return run_agent(AGENT, prompt or system_prompt(state), question)
+
+
+async def arun_ghc_dt(question: str, state: Optional[Dict[str, Any]] = None,
+                      agents: Optional[Sequence[str]] = None, prompt: Optional[str] = None) -> Dict[str, Any]:
+    """Async CEO Digital Twin"""
+    agents = _configured_agents() if agents is None else agents
+    if agents:
+        return await aorchestrate(question, state, agents, prompt=prompt)
+    return await arun_agent(AGENT, prompt or system_prompt(state), question)
+
+
+def stream_ghc_dt(question: str, state: Optional[Dict[str, Any]] = None,
+                  agents: Optional[Sequence[str]] = None, prompt: Optional[str] = None,
+                  on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> AgentStream:
+    """Streaming CEO Digital Twin
+
+    Sub-agent briefings (if any) are gathered before the first chunk is produced.
+    ``on_complete`` gets the final result, briefings included.
+    """
+    agents = _configured_agents() if agents is None else agents
+    briefings = run_sync(abrief(question, state, agents)) if agents else {}
+
+    def complete(result: Dict[str, Any]) -> None:
+        _merge_briefings(result, briefings)
+        if on_complete:
+            on_complete(result)
+
+    return stream_agent(AGENT, _with_briefings(prompt or system_prompt(state), briefings), question, complete)
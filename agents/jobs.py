@@ -0,0 +1,380 @@
+"""Background jobs - SQLite-backed queue and worker pool for long-running agent analyses
+
+Jobs run on worker threads outside the Streamlit script, so a rerun or a
+dropped connection does not kill them. Status, progress and results are
+stored in SQLite (AGENTS_JOB_DB). Anyone holding the job id can poll it, and
+with a file path the queue also survives restarts::
+
+    job_id = submit("review", question="Should we open a second grow site?")
+    get_job(job_id)["progress"]               # 0.0 .. 1.0
+    get_job(job_id)["result"]                 # once status == "done"
+
+A task is a function ``task(params, progress)`` that returns a JSON-serializable
+result. It calls ``progress(fraction, message)`` as it goes. That call raises
+JobCancelled once the job has been cancelled.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+from . import dispatch
+from .batch import run_batch
+from .ghc_dt import orchestrate
+from .limiter import current_tenant, use_tenant
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+COLUMNS = ("id", "kind", "params", "status", "progress", "message", "result", "error", "owner",
+           "created", "started", "finished", "heartbeat", "cancel")
+
+Progress = Callable[..., None]
+Task = Callable[[Dict[str, Any], Progress], Any]
+
+
+class JobCancelled(Exception):
+    """Raised inside a task when its job was cancelled"""
+
+
+class JobStore:
+    """SQLite job table; claiming is atomic, so several workers (or processes on a file) can share it"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0, message TEXT NOT NULL DEFAULT '', result TEXT, error TEXT,
+                owner TEXT NOT NULL DEFAULT '', created REAL NOT NULL, started REAL, finished REAL,
+                heartbeat REAL, cancel INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+            CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created);
+        """)
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _update(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def submit(self, kind: str, params: Dict[str, Any], owner: str = "") -> str:
+        """Queue a job and return its id"""
+        job_id = uuid.uuid4().hex
+        self._update(
+            "INSERT INTO jobs (id, kind, params, status, owner, created) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, kind, json.dumps(params), owner, time.time())
+        )
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it (None when the queue is empty)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', started = ?, heartbeat = ? WHERE id = ?",
+                        (now, now, row[0])
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row is not None else None
+
+    def progress(self, job_id: str, fraction: float, message: str = "") -> bool:
+        """Record progress (and a heartbeat); returns whether the job was cancelled"""
+        self._update(
+            "UPDATE jobs SET progress = ?, message = ?, heartbeat = ? WHERE id = ?",
+            (min(max(fraction, 0.0), 1.0), message, time.time(), job_id)
+        )
+        return self._cancelled(job_id)
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Mark a running job as alive without changing its progress; returns whether it was cancelled"""
+        self._update("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+        return self._cancelled(job_id)
+
+    def _cancelled(self, job_id: str) -> bool:
+        rows = self._rows("SELECT cancel FROM jobs WHERE id = ?", (job_id,))
+        return bool(rows and rows[0][0])
+
+    def finish(self, job_id: str, result: Any) -> None:
+        self._update(
+            "UPDATE jobs SET status = 'done', progress = 1, result = ?, finished = ? WHERE id = ?",
+            (json.dumps(result), time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str, status: str = "failed") -> None:
+        self._update(
+            "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ?", (status, error, time.time(), job_id)
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job now, or ask a running one to stop at its next progress report"""
+        if self._update(
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), job_id)
+        ):
+            return True
+        return bool(self._update("UPDATE jobs SET cancel = 1 WHERE id = ? AND status = 'running'", (job_id,)))
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """Queue running jobs again whose worker stopped reporting (e.g. the process restarted)"""
+        return self._update(
+            "UPDATE jobs SET status = 'queued', progress = 0, message = 'requeued' "
+            "WHERE status = 'running' AND heartbeat < ?", (time.time() - stale_after,)
+        )
+
+    def _job(self, row: tuple) -> Dict[str, Any]:
+        job = dict(zip(COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel"] = bool(job["cancel"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return self._job(rows[0]) if rows else None
+
+    def list(self, owner: Optional[str] = None, status: Optional[str] = None,
+             limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest jobs first, optionally for one owner and/or status"""
+        where, params = [], []
+        if owner is not None:
+            where.append("owner = ?")
+            params.append(owner)
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self._rows(sql + " ORDER BY created DESC LIMIT ?", tuple(params) + (limit,))
+        return [self._job(row) for row in rows]
+
+
+def agent_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """One question to one agent"""
+    progress(0.0, f"Asking {params['agent']}")
+    return dispatch(params["agent"], params["question"], params.get("state"))
+
+
+def batch_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """Many questions to one agent, in chunks so progress is reported as they finish"""
+    questions = params["questions"]
+    chunk = int(params.get("chunk", 8))
+    results, meta = [], {"tokens": 0, "errors": 0}
+    for start in range(0, len(questions), chunk):
+        progress(start / len(questions), f"{start}/{len(questions)} questions answered")
+        batch = run_batch(params["agent"], questions[start:start + chunk], params.get("state"))
+        results.extend(batch["results"])
+        meta["tokens"] += batch["meta"]["tokens"]
+        meta["errors"] += batch["meta"]["errors"]
+    return {"results": results, "meta": {"agent": params["agent"], "count": len(results), **meta}}
+
+
+REVIEW_AGENTS = ("finance", "strategy", "market", "risk", "compliance", "operations")
+
+
+def review_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """Multi-agent review: the specialists answer concurrently, then the CEO twin synthesizes their views"""
+    question, state = params["question"], params.get("state")
+    agents = list(params.get("agents") or REVIEW_AGENTS)
+    answers: Dict[str, Dict[str, Any]] = {}
+    # Briefings arrive on the shared agents event loop; their SQLite writes go to this thread, in order
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-progress")
+    reports: List[Future] = []
+
+    def briefed(agent: str, result: Dict[str, Any]) -> None:
+        for report in reports:
+            if report.done() and report.exception() is not None:
+                raise report.exception()  # e.g. JobCancelled: stop the remaining specialists
+        answers[agent] = result
+        done = len(answers) == len(agents)
+        reports.append(writer.submit(progress, len(answers) / (len(agents) + 1),
+                                     "Synthesizing" if done else f"{agent} answered ({len(answers)}/{len(agents)})"))
+
+    progress(0.0, f"Asking {', '.join(agents)}")
+    try:
+        summary = orchestrate(question, state, agents, on_briefing=briefed)
+    finally:
+        writer.shutdown(wait=True)
+    for report in reports:
+        report.result()
+    return {"answer": summary["answer"], "answers": {agent: answers[agent] for agent in agents},
+            "meta": {"tokens": summary["meta"]["tokens"]}}
+
+
+# Job kind -> task function
+TASKS: Dict[str, Task] = {"agent": agent_task, "batch": batch_task, "review": review_task}
+
+
+def register_task(kind: str, task: Task) -> None:
+    """Add (or replace) a job kind"""
+    TASKS[kind] = task
+
+
+class WorkerPool:
+    """Worker threads that claim and run jobs from a store until stopped
+
+    A running job's heartbeat is refreshed every ``heartbeat`` seconds whether or
+    not it reports progress, so only jobs whose worker is gone look stale.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 2, poll_interval: float = 1.0, heartbeat: float = 30.0):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self, stale_after: float = 300.0) -> "WorkerPool":
+        """Requeue jobs abandoned by a previous process, then start the workers"""
+        requeued = self.store.requeue_stale(stale_after)
+        if requeued:
+            logger.info("Requeued %d stale jobs", requeued)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"agent-jobs-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def notify(self) -> None:
+        """Wake idle workers (called after a submit in this process)"""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the running jobs finish"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim()
+            except Exception:
+                # e.g. the database is locked by another process or the disk is full; keep the worker alive
+                backoff = min(max(backoff * 2, self.poll_interval), 60.0)
+                logger.exception("Claiming a job failed; retrying in %.0fs", backoff)
+                self._stop.wait(backoff)
+                continue
+            backoff = 0.0
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self.run_job(job)
+
+    def run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        finished, cancelled = threading.Event(), threading.Event()
+
+        def progress(fraction: float, message: str = "") -> None:
+            if self.store.progress(job_id, fraction, message) or cancelled.is_set():
+                raise JobCancelled(job_id)
+
+        beat = threading.Thread(target=self._beat, args=(job_id, finished, cancelled),
+                                name=f"agent-jobs-heartbeat-{job_id[:8]}", daemon=True)
+        beat.start()
+        try:
+            task = TASKS.get(job["kind"])
+            if task is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            with use_tenant(job["params"].get("tenant")):
+                self.store.finish(job_id, task(job["params"], progress))
+        except JobCancelled:
+            self.store.fail(job_id, "cancelled", status="cancelled")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job["kind"])
+            self.store.fail(job_id, str(e))
+        finally:
+            finished.set()
+            beat.join()
+
+    def _beat(self, job_id: str, finished: threading.Event, cancelled: threading.Event) -> None:
+        while not finished.wait(self.heartbeat):
+            try:
+                if self.store.heartbeat(job_id):
+                    cancelled.set()
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job_id)
+
+
+_lock = threading.Lock()
+_store: Optional[JobStore] = None
+_pool: Optional[WorkerPool] = None
+
+
+def get_store() -> JobStore:
+    """Process-wide job store at AGENTS_JOB_DB (in memory when unset)"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = JobStore(os.getenv("AGENTS_JOB_DB") or ":memory:")
+    return _store
+
+
+def get_pool() -> WorkerPool:
+    """Process-wide worker pool (AGENTS_JOB_WORKERS threads, default 2), started on first use"""
+    global _pool
+    store = get_store()
+    with _lock:
+        if _pool is None:
+            _pool = WorkerPool(
+                store,
+                workers=int(os.getenv("AGENTS_JOB_WORKERS", "2")),
+                poll_interval=float(os.getenv("AGENTS_JOB_POLL", "1.0")),
+                heartbeat=float(os.getenv("AGENTS_JOB_HEARTBEAT", "30")),
+            ).start(stale_after=float(os.getenv("AGENTS_JOB_STALE", "300")))
+    return _pool
+
+
+def submit(kind: str, owner: str = "", **params) -> str:
+    """Queue a job (``agent``, ``batch``, ``review`` or a registered kind) and return its id
+
+    The job runs as the submitting tenant, so it counts against that tenant's rate limits.
+    """
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    params.setdefault("tenant", current_tenant())
+    pool = get_pool()
+    job_id = pool.store.submit(kind, params, owner)
+    pool.notify()
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Current status, progress and result of a job"""
+    return get_store().get(job_id)
+
+
+def list_jobs(owner: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Newest jobs first, optionally only ``owner``'s"""
+    return get_store().list(owner=owner, limit=limit)
+
+
+def cancel(job_id: str) -> bool:
+    """Cancel a queued or running job"""
+    return get_store().cancel(job_id)
@@ -0,0 +1,269 @@
+"""Rate limiting and request coalescing - per-tenant token buckets and single-flight model calls
+
+Every model call first reserves one request and its estimated prompt tokens
+from its tenant's buckets and from the process-wide buckets. It waits, up to
+AGENTS_RATE_MAX_WAIT seconds, when a bucket is empty. Once the call finishes,
+the token reservation is corrected to the actual usage. Limits are per minute
+and 0 means unlimited:
+
+    AGENTS_RATE_RPM / AGENTS_RATE_TPM                  per tenant
+    AGENTS_RATE_GLOBAL_RPM / AGENTS_RATE_GLOBAL_TPM    all tenants together
+
+The tenant is ``<org>/<user>``, set with ``use_tenant``. It defaults to
+AGENTS_TENANT, else ORG_ID, else "default"::
+
+    with use_tenant("ghc/ceo"):
+        run_finance("Cash runway at ZEC 4%?")
+
+Identical requests in flight at the same time (same cache key) share one
+upstream call through ``single_flight`` (AGENTS_COALESCE=0 turns it off).
+"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Any, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+_tenant: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("agents_tenant", default=None)
+
+
+class RateLimited(Exception):
+    """Raised when a call would have to wait longer than AGENTS_RATE_MAX_WAIT for its tenant's limits"""
+
+
+@contextmanager
+def use_tenant(tenant: Optional[str]) -> Iterator[None]:
+    """Charge agent calls made inside the block to ``tenant`` (``<org>/<user>``)"""
+    token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+def current_tenant() -> str:
+    return _tenant.get() or os.getenv("AGENTS_TENANT") or os.getenv("ORG_ID") or "default"
+
+
+class TokenBucket:
+    """Refills at ``rate`` per second up to ``capacity``; reservations may overdraw it, which delays later callers"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` (at most the capacity) and return how long to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take ``amount`` more, or give it back when negative"""
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - amount)
+
+    def level(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._level
+
+
+class Limiter:
+    """Request and token buckets per tenant plus one global pair (limits per minute, 0 = unlimited)"""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, global_rpm: float = 0, global_tpm: float = 0,
+                 max_wait: float = 10.0):
+        self.rpm, self.tpm = rpm, tpm
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._global = (self._bucket(global_rpm), self._bucket(global_tpm))
+
+    @staticmethod
+    def _bucket(per_minute: float) -> Optional[TokenBucket]:
+        return TokenBucket(per_minute / 60, per_minute) if per_minute else None
+
+    def _buckets(self, tenant: str) -> List[Tuple[Optional[TokenBucket], Optional[TokenBucket]]]:
+        with self._lock:
+            buckets = self._tenants.get(tenant)
+            if buckets is None:
+                buckets = self._tenants[tenant] = (self._bucket(self.rpm), self._bucket(self.tpm))
+        return [buckets, self._global]
+
+    def reserve(self, tenant: str, tokens: int) -> float:
+        """Reserve one request and ``tokens`` for ``tenant``; returns the wait, or raises RateLimited"""
+        taken = []
+        for requests, token_bucket in self._buckets(tenant):
+            for bucket, amount in ((requests, 1), (token_bucket, tokens)):
+                if bucket is not None:
+                    taken.append((bucket, amount, bucket.reserve(amount)))
+        delay = max((wait for _, _, wait in taken), default=0.0)
+        if delay > self.max_wait:
+            for bucket, amount, _ in taken:
+                bucket.adjust(-min(amount, bucket.capacity))
+            raise RateLimited(f"Rate limit for {tenant} exceeded (retry in {delay:.1f}s)")
+        return delay
+
+    def acquire(self, tenant: str, tokens: int) -> None:
+        """Reserve, then sleep until the reservation is usable"""
+        delay = self.reserve(tenant, tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self, tenant: str, tokens: int) -> None:
+        """Async version of acquire"""
+        delay = self.reserve(tenant, tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def settle(self, tenant: str, tokens: int) -> None:
+        """Correct a token reservation by ``tokens`` (actual minus reserved)"""
+        if tokens:
+            for _, token_bucket in self._buckets(tenant):
+                if token_bucket is not None:
+                    token_bucket.adjust(tokens)
+
+    def levels(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Remaining requests and tokens per tenant ("*" for the global limits)"""
+        with self._lock:
+            tenants = dict(self._tenants, **{"*": self._global})
+        return {
+            tenant: {
+                "requests": round(requests.level(), 1) if requests else None,
+                "tokens": round(token_bucket.level()) if token_bucket else None,
+            }
+            for tenant, (requests, token_bucket) in tenants.items()
+        }
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving while it is in flight get its result (or error)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._acalls: Dict[Tuple[int, str], "_Flight"] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """``(fn(), False)`` for the leader, ``(leader's result, True)`` for callers that joined it"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            value = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async version of do; calls are shared within one event loop
+
+        The call runs in its own task, so cancelling the leader (e.g. its own
+        timeout) does not cancel it for callers that joined. It is only cancelled
+        once every caller waiting on it has gone.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            flight = self._acalls.get(slot)
+            leader = flight is None
+            if leader:
+                flight = self._acalls[slot] = _Flight(loop.create_task(fn()))
+                flight.task.add_done_callback(lambda task: self._landed(slot, flight))
+            flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), not leader
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+                if abandoned:
+                    self._forget(slot, flight)
+            if abandoned:
+                flight.task.cancel()
+
+    def _forget(self, slot: Tuple[int, str], flight: "_Flight") -> None:
+        # Later callers start a new call; waiters of this one keep their reference. Hold self._lock.
+        if self._acalls.get(slot) is flight:
+            del self._acalls[slot]
+
+    def _landed(self, slot: Tuple[int, str], flight: "_Flight") -> None:
+        if not flight.task.cancelled():
+            flight.task.exception()  # the waiters re-raise it; don't warn when there are none
+        with self._lock:
+            self._forget(slot, flight)
+
+
+class _Flight:
+    """An async call in flight and the number of callers waiting on it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+_lock = threading.Lock()
+_limiter: Optional[Limiter] = None
+flights = SingleFlight()
+
+
+def get_limiter() -> Limiter:
+    """Process-wide limiter configured from AGENTS_RATE_*"""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = Limiter(
+                rpm=float(os.getenv("AGENTS_RATE_RPM", "0")),
+                tpm=float(os.getenv("AGENTS_RATE_TPM", "0")),
+                global_rpm=float(os.getenv("AGENTS_RATE_GLOBAL_RPM", "0")),
+                global_tpm=float(os.getenv("AGENTS_RATE_GLOBAL_TPM", "0")),
+                max_wait=float(os.getenv("AGENTS_RATE_MAX_WAIT", "10")),
+            )
+    return _limiter
+
+
+def reset() -> None:
+    """Drop all buckets and re-read the limits (tests and benchmarks)"""
+    global _limiter
+    with _lock:
+        _limiter = None
+
+
+def coalescing() -> bool:
+    return os.getenv("AGENTS_COALESCE", "1").lower() not in ("0", "false", "no")
+
+
+def single_flight(key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+    """Share one call of ``fn`` among identical concurrent requests; returns (value, shared)"""
+    return flights.do(key, fn) if coalescing() else (fn(), False)
+
+
+async def asingle_flight(key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+    """Async version of single_flight"""
+    return await flights.ado(key, fn) if coalescing() else (await fn(), False)
@@ -0,0 +1,230 @@
+"""Agent metrics - latency, time to first token, error/cache rates and throughput per agent and model
+
+Every agent result is recorded here by the runtime. Read the numbers with
+``snapshot()``, or scrape them in Prometheus text format from the exporter
+started with ``start_http_server()`` (the dashboard starts it when
+AGENTS_METRICS_PORT is set)::
+
+    curl localhost:9108/metrics
+"""
+import os
+import math
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TTFT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+# Recent observations kept per series for percentiles
+SAMPLE_SIZE = 2048
+
+
+class Histogram:
+    """Cumulative bucket counts for Prometheus plus recent samples for percentiles"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: "deque[float]" = deque(maxlen=SAMPLE_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        return samples[min(max(math.ceil(len(samples) * p / 100) - 1, 0), len(samples) - 1)]
+
+
+class _Series:
+    """Counters and histograms of one (agent, model) pair"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.generation_seconds = 0.0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.ttft = Histogram(TTFT_BUCKETS)
+
+
+class Metrics:
+    """Thread-safe metric store keyed by (agent, model)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Count one agent result using the fields of its meta"""
+        meta = result["meta"]
+        key = (meta["agent"], meta.get("model") or "unknown")
+        latency = meta.get("latency_ms")
+        ttft = meta.get("ttft_ms")
+        with self._lock:
+            series = self._series.setdefault(key, _Series())
+            series.calls += 1
+            if meta.get("error"):
+                series.errors += 1
+            if meta.get("cached"):
+                series.cache_hits += 1
+            if meta.get("fallback"):
+                series.fallbacks += 1
+            if latency is not None:
+                series.latency.observe(latency / 1000)
+            if ttft is not None:
+                series.ttft.observe(ttft / 1000)
+            if not meta.get("cached") and meta.get("completion_tokens") and latency:
+                # Generation time excludes the wait for the first token when it is known
+                series.prompt_tokens += meta.get("prompt_tokens", 0)
+                series.completion_tokens += meta["completion_tokens"]
+                series.generation_seconds += max(latency - (ttft or 0), 1.0) / 1000
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One row per agent and model with rates, latency percentiles (ms) and tokens/sec"""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+
+        rows = []
+        with self._lock:
+            for (agent, model), series in sorted(self._series.items()):
+                rows.append({
+                    "agent": agent,
+                    "model": model,
+                    "calls": series.calls,
+                    "error_rate": round(series.errors / series.calls, 4),
+                    "cache_hit_rate": round(series.cache_hits / series.calls, 4),
+                    "fallbacks": series.fallbacks,
+                    "p50_ms": ms(series.latency.percentile(50)),
+                    "p95_ms": ms(series.latency.percentile(95)),
+                    "p99_ms": ms(series.latency.percentile(99)),
+                    "ttft_p50_ms": ms(series.ttft.percentile(50)),
+                    "ttft_p95_ms": ms(series.ttft.percentile(95)),
+                    "tokens_per_sec": (
+                        round(series.completion_tokens / series.generation_seconds, 1)
+                        if series.generation_seconds else None
+                    ),
+                })
+        return rows
+
+    def totals(self) -> Dict[str, int]:
+        """Calls, errors and cache hits across every agent"""
+        with self._lock:
+            return {
+                "calls": sum(series.calls for series in self._series.values()),
+                "errors": sum(series.errors for series in self._series.values()),
+                "cache_hits": sum(series.cache_hits for series in self._series.values()),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, hist: Histogram) -> None:
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            series = sorted(self._series.items())
+            counters = (
+                ("agents_calls_total", "calls", "Agent results returned"),
+                ("agents_errors_total", "errors", "Agent results that were errors"),
+                ("agents_cache_hits_total", "cache_hits", "Agent results served from the response cache"),
+                ("agents_fallbacks_total", "fallbacks", "Agent results served by the fallback path"),
+                ("agents_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent to the model"),
+                ("agents_completion_tokens_total", "completion_tokens", "Completion tokens generated"),
+                ("agents_generation_seconds_total", "generation_seconds", "Seconds spent generating completions"),
+            )
+            for name, field, help_text in counters:
+                header(name, "counter", help_text)
+                for (agent, model), values in series:
+                    lines.append(f'{name}{{agent="{agent}",model="{model}"}} {getattr(values, field):g}')
+
+            header("agents_latency_seconds", "histogram", "Wall-clock latency of agent calls")
+            for (agent, model), values in series:
+                histogram("agents_latency_seconds", f'agent="{agent}",model="{model}"', values.latency)
+
+            header("agents_ttft_seconds", "histogram", "Time to first streamed token")
+            for (agent, model), values in series:
+                histogram("agents_ttft_seconds", f'agent="{agent}",model="{model}"', values.ttft)
+
+        from .resilience import breaker_states
+
+        header("agents_circuit_open", "gauge", "1 while the model's circuit breaker is not closed")
+        for model, state in sorted(breaker_states().items()):
+            lines.append(f'agents_circuit_open{{model="{model}"}} {0 if state == "closed" else 1}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def record(result: Dict[str, Any]) -> None:
+    """Record one agent result in the process-wide metrics"""
+    metrics.record(result)
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    return metrics.snapshot()
+
+
+def render_prometheus() -> str:
+    return metrics.render_prometheus()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_servers: Dict[int, ThreadingHTTPServer] = {}
+
+
+def start_http_server(port: Optional[int] = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics on a background thread (AGENTS_METRICS_PORT, default 9108); idempotent per port"""
+    port = port if port is not None else int(os.getenv("AGENTS_METRICS_PORT", "9108"))
+    with metrics._lock:
+        server = _servers.get(port)
+        if server is None:
+            server = ThreadingHTTPServer((host, port), _Handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="agents-metrics", daemon=True).start()
+            _servers[port] = server
+    return server
+
@@ -0,0 +1,401 @@
+"""Call pipeline - deadlines, jittered retries, hedged requests and a per-model circuit breaker
+
+Every model call goes through ``call`` (threads) or ``acall`` (asyncio). An
+attempt is a callable taking the per-attempt timeout in seconds::
+
+    response, info = call(model, lambda timeout: client.chat.completions.create(..., timeout=timeout))
+
+Settings (environment):
+    AGENTS_DEADLINE            total seconds for a call including retries (default 30)
+    AGENTS_RETRIES             retries on transient errors (default 2)
+    AGENTS_RETRY_BACKOFF       base backoff in seconds, doubled per retry (default 0.5)
+    AGENTS_HEDGE_PERCENTILE    fire a second attempt once the first is slower than this
+                               latency percentile of the model, e.g. 95 (default 0 = off)
+    AGENTS_HEDGE_MIN_SAMPLES   latencies needed before hedging starts (default 20)
+    AGENTS_BREAKER_FAILURES    consecutive failures that open a model's circuit (default 5)
+    AGENTS_BREAKER_RESET       seconds an open circuit waits before a trial call (default 30)
+"""
+import os
+import time
+import random
+import asyncio
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Optional, Tuple, Awaitable
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's overall deadline passed before a response arrived"""
+
+
+class CircuitOpen(Exception):
+    """The model's circuit breaker is open; the call was not attempted"""
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class Deadline:
+    """Absolute point in time a call must finish by"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds if seconds is not None else _env_float("AGENTS_DEADLINE", 30.0)
+        self.expires = time.monotonic() + self.seconds
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def check(self) -> float:
+        """Seconds left; raises DeadlineExceeded when none are"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"deadline of {self.seconds:g}s exceeded")
+        return remaining
+
+
+def status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limit(error: Exception) -> bool:
+    return status_code(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth retrying: timeouts, dropped connections, rate limits and 5xx responses"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in ("APITimeoutError", "APIConnectionError", "RateLimitError",
+                                "InternalServerError", "TimeoutException", "ConnectError",
+                                "ReadError", "RemoteProtocolError"):
+        return True
+    code = status_code(error)
+    return code is not None and (code == 429 or code >= 500)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(retry: int, base: float, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff so concurrent callers do not retry in lockstep"""
+    return random.uniform(0, min(cap, base * 2 ** retry))
+
+
+class LatencyTracker:
+    """Recent successful attempt latencies of one model"""
+
+    def __init__(self, size: int = 200):
+        self._samples: "deque[float]" = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * p / 100), len(samples) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial after ``reset_timeout``"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[str]:
+        """Permit for a call: "closed", "trial" (the single half-open call) or None when rejected"""
+        with self._lock:
+            if self.state == "closed":
+                return "closed"
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return "trial"
+            return None
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one trial call is let through"""
+        return self.acquire() is not None
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def postpone(self) -> None:
+        """A trial was turned away (rate limited): wait another ``reset_timeout`` without counting a failure"""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A trial ended without an outcome (cancelled, deadline passed): let the next call make it"""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def breaker(model: str) -> CircuitBreaker:
+    """Circuit breaker shared by every call to ``model``"""
+    with _lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(
+                int(os.getenv("AGENTS_BREAKER_FAILURES", "5")), _env_float("AGENTS_BREAKER_RESET", 30.0)
+            )
+        return _breakers[model]
+
+
+def latencies(model: str) -> LatencyTracker:
+    with _lock:
+        return _latencies.setdefault(model, LatencyTracker())
+
+
+def breaker_states() -> Dict[str, str]:
+    """Circuit state per model: closed, open or half_open"""
+    with _lock:
+        return {model: b.state for model, b in _breakers.items()}
+
+
+def reset() -> None:
+    """Forget breaker state and latency history (e.g. after switching providers)"""
+    with _lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def _hedge_delay(model: str) -> Optional[float]:
+    percentile = _env_float("AGENTS_HEDGE_PERCENTILE", 0.0)
+    tracker = latencies(model)
+    if not percentile or len(tracker) < int(os.getenv("AGENTS_HEDGE_MIN_SAMPLES", "20")):
+        return None
+    return tracker.percentile(percentile)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=int(os.getenv("AGENTS_HEDGE_WORKERS", "16")),
+                                       thread_name_prefix="agents-hedge")
+        return _pool
+
+
+def _record(model: str, error: Optional[Exception], started: float) -> None:
+    if error is None:
+        latencies(model).add(time.monotonic() - started)
+        breaker(model).success()
+    elif is_rate_limit(error):
+        # Rate limits mean "slow down", not "provider down"; they do not trip the breaker
+        breaker(model).postpone()
+    elif is_transient(error):
+        breaker(model).failure()
+    else:
+        # The provider answered (e.g. 400 for a bad request), so it is up
+        breaker(model).success()
+
+
+def _timed(model: str, attempt: Callable[[float], Any], timeout: float) -> Any:
+    started = time.monotonic()
+    try:
+        response = attempt(timeout)
+    except Exception as e:
+        _record(model, e, started)
+        raise
+    _record(model, None, started)
+    return response
+
+
+def _release(attempt: Any) -> None:
+    """Done-callback for a losing attempt: close what it returned (an open stream holds a pooled connection)"""
+    if attempt.cancelled() or attempt.exception() is not None:
+        return
+    close = getattr(attempt.result(), "close", None)
+    if close is None:
+        return
+    try:
+        closing = close()
+        if inspect.isawaitable(closing):
+            asyncio.ensure_future(closing)
+    except Exception:
+        pass  # the caller already has its answer; a failed close only loses the connection
+
+
+def _hedged(model: str, attempt: Callable[[float], Any], deadline: Deadline) -> Tuple[Any, bool]:
+    """One attempt, plus a second one if the first outlives the model's hedge percentile"""
+    delay = _hedge_delay(model)
+    if delay is None or delay >= deadline.remaining():
+        return _timed(model, attempt, deadline.check()), False
+
+    pool = _executor()
+    attempts = [pool.submit(_timed, model, attempt, deadline.check())]
+    done, pending = wait(attempts, timeout=delay)
+    hedged = False
+    if not done:
+        attempts.append(pool.submit(_timed, model, attempt, deadline.check()))
+        pending.add(attempts[-1])
+        hedged = True
+
+    winner = None
+    error: Optional[Exception] = None
+    try:
+        while pending or done:
+            for future in done:
+                if future.exception() is None:
+                    winner = future
+                    return future.result(), hedged
+                error = future.exception()
+            if not pending:
+                break
+            done, pending = wait(pending, timeout=max(deadline.remaining(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f"deadline of {deadline.seconds:g}s exceeded")
+    finally:
+        for future in attempts:
+            if future is not winner:
+                future.cancel()
+                future.add_done_callback(_release)
+    raise error
+
+
+def call(model: str, attempt: Callable[[float], Any], retries: Optional[int] = None,
+         backoff: Optional[float] = None, deadline: Optional[float] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``attempt(timeout)`` under the pipeline; returns (response, {"attempts", "hedged"})
+
+    Raises CircuitOpen without calling out when the model's circuit is open, and
+    re-raises the last error once retries or the deadline run out.
+    """
+    retries = int(os.getenv("AGENTS_RETRIES", "2")) if retries is None else retries
+    backoff = _env_float("AGENTS_RETRY_BACKOFF", 0.5) if backoff is None else backoff
+    limit = Deadline(deadline)
+    for retry in range(retries + 1):
+        permit = breaker(model).acquire()
+        if permit is None:
+            raise CircuitOpen(f"circuit open for {model}")
+        try:
+            response, hedged = _hedged(model, attempt, limit)
+            return response, {"attempts": retry + 1, "hedged": hedged}
+        except Exception as e:
+            if retry == retries or not is_transient(e):
+                raise
+            delay = _retry_after(e) or backoff_delay(retry, backoff)
+            if delay >= limit.remaining():
+                raise
+        finally:
+            # A recorded outcome already moved the breaker on; otherwise free the half-open slot
+            if permit == "trial":
+                breaker(model).release()
+        time.sleep(delay)
+
+
+async def _atimed(model: str, attempt: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+    started = time.monotonic()
+    try:
+        response = await asyncio.wait_for(attempt(timeout), timeout)
+    except Exception as e:
+        _record(model, e, started)
+        raise
+    _record(model, None, started)
+    return response
+
+
+async def _ahedged(model: str, attempt: Callable[[float], Awaitable[Any]], deadline: Deadline) -> Tuple[Any, bool]:
+    delay = _hedge_delay(model)
+    if delay is None or delay >= deadline.remaining():
+        return await _atimed(model, attempt, deadline.check()), False
+
+    attempts = [asyncio.ensure_future(_atimed(model, attempt, deadline.check()))]
+    done, pending = await asyncio.wait(attempts, timeout=delay)
+    hedged = False
+    if not done:
+        attempts.append(asyncio.ensure_future(_atimed(model, attempt, deadline.check())))
+        pending.add(attempts[-1])
+        hedged = True
+
+    winner = None
+    error: Optional[BaseException] = None
+    try:
+        while pending or done:
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return task.result(), hedged
+                error = task.exception()
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, timeout=max(deadline.remaining(), 0),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f"deadline of {deadline.seconds:g}s exceeded")
+    finally:
+        # Losing attempts may still finish: their errors are retrieved so they are not reported,
+        # and their responses closed
+        for task in attempts:
+            if task is not winner:
+                task.cancel()
+                task.add_done_callback(_release)
+    raise error
+
+
+async def acall(model: str, attempt: Callable[[float], Awaitable[Any]], retries: Optional[int] = None,
+                backoff: Optional[float] = None, deadline: Optional[float] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Async version of call; ``attempt(timeout)`` returns an awaitable"""
+    retries = int(os.getenv("AGENTS_RETRIES", "2")) if retries is None else retries
+    backoff = _env_float("AGENTS_RETRY_BACKOFF", 0.5) if backoff is None else backoff
+    limit = Deadline(deadline)
+    for retry in range(retries + 1):
+        permit = breaker(model).acquire()
+        if permit is None:
+            raise CircuitOpen(f"circuit open for {model}")
+        try:
+            response, hedged = await _ahedged(model, attempt, limit)
+            return response, {"attempts": retry + 1, "hedged": hedged}
+        except Exception as e:
+            if retry == retries or not is_transient(e):
+                raise
+            delay = _retry_after(e) or backoff_delay(retry, backoff)
+            if delay >= limit.remaining():
+                raise
+        finally:
+            # Also runs on CancelledError, so a cancelled trial never leaves the circuit half-open
+            if permit == "trial":
+                breaker(model).release()
+        await asyncio.sleep(delay)
+
+
+def degraded(error: Exception) -> bool:
+    """Whether a failed call should be answered from the fallback path rather than as an error"""
+    return isinstance(error, CircuitOpen) or is_transient(error)
@@ -0,0 +1,346 @@
+"""Agent runtime - shared sync and async chat calls used by every agent"""
+import os
+import time
+import logging
+from typing import Dict, Any, List, Callable, Iterator, Optional
+
+from . import cache, evidence, limiter, metrics, resilience, tokens
+from .client import get_client, get_async_client, get_model, get_temperature
+
+logger = logging.getLogger(__name__)
+
+
+def messages(system_prompt: str, question: str) -> List[Dict[str, str]]:
+    """Chat messages for one question"""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": question}
+    ]
+
+
+def unconfigured_result(agent: str) -> Dict[str, Any]:
+    """Result returned when no API key is available"""
+    return {
+        "answer": "OPENAI_API_KEY not configured",
+        "meta": {"agent": agent, "tokens": 0, "error": "OPENAI_API_KEY not configured"}
+    }
+
+
+def error_result(agent: str, error: Exception) -> Dict[str, Any]:
+    """Result returned when the call failed"""
+    return {"answer": f"Error: {str(error)}", "meta": {"agent": agent, "tokens": 0, "error": str(error)}}
+
+
+def failed(agent: str, error: Exception, started: float) -> Dict[str, Any]:
+    """Error result for a call started at ``started`` (perf_counter), counted in the metrics"""
+    result = error_result(agent, error)
+    result["meta"].update(model=get_model(agent), latency_ms=round((time.perf_counter() - started) * 1000, 1))
+    metrics.record(result)
+    return result
+
+
+class _Call:
+    """One prepared call: resolved model settings, fitted prompt and cache key
+
+    With ``record=False`` (housekeeping calls such as session summaries) the
+    answer stays out of the evidence log, and so out of the semantic index, and
+    no earlier answer is reused for it.
+    """
+
+    def __init__(self, agent: str, system_prompt: str, question: str, record: bool = True):
+        self.agent = agent
+        self.question = question
+        self.record = record
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.model, self.temperature = get_model(agent), get_temperature(agent)
+        self.system_prompt, self.prompt_question, self.estimate, self.trimmed = tokens.fit_prompt(
+            agent, self.model, system_prompt, question
+        )
+        self.key = cache.cache_key(agent, self.model, self.temperature, self.system_prompt, self.prompt_question)
+        self.suggestion: Optional[Dict[str, Any]] = None
+        self.tenant: Optional[str] = None
+
+    def cached(self) -> Optional[Dict[str, Any]]:
+        """Cached result for this call: an exact cache hit, else a reused answer to a similar question"""
+        result = cache.lookup(self.key, self.temperature)
+        if result is None:
+            result = self.similar()
+        return self._done(result) if result is not None else None
+
+    def similar(self) -> Optional[Dict[str, Any]]:
+        """Earlier answer to a similar question (AGENTS_SEMANTIC=reuse), or keep it as a suggestion (=suggest)"""
+        mode = os.getenv("AGENTS_SEMANTIC", "off").lower()
+        if not self.record or mode not in ("reuse", "suggest") or not cache.cacheable(self.temperature):
+            return None
+        from . import semantic  # imports NumPy, so only when semantic reuse is on
+        try:
+            match = semantic.match(self.agent, self.question, self.system_prompt)
+        except Exception:
+            logger.exception("Semantic index lookup failed")
+            return None
+        if match is None:
+            return None
+        found = {"question": match["question"], "score": match["score"], "timestamp": match["timestamp"]}
+        if mode == "suggest":
+            self.suggestion = {**found, "answer": match["answer"]}
+            return None
+        return {
+            "answer": match["answer"],
+            "meta": {"agent": self.agent, "model": match["model"], "tokens": 0, "cached": True, "semantic": found}
+        }
+
+    def request(self, **options) -> Dict[str, Any]:
+        """Arguments for chat.completions.create; raises BudgetExceeded when over budget"""
+        tokens.check_budget(self.agent, self.estimate)
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": messages(self.system_prompt, self.prompt_question),
+            **options
+        }
+
+    def acquire(self) -> None:
+        """Wait for the current tenant's rate limits; raises RateLimited if that would take too long"""
+        self.tenant = limiter.current_tenant()
+        limiter.get_limiter().acquire(self.tenant, self.estimate)
+
+    async def aacquire(self) -> None:
+        """Async version of acquire"""
+        self.tenant = limiter.current_tenant()
+        await limiter.get_limiter().aacquire(self.tenant, self.estimate)
+
+    def settle(self, spent: int) -> None:
+        """Correct the rate limiter's token reservation to what the call actually spent"""
+        if self.tenant is not None:
+            limiter.get_limiter().settle(self.tenant, spent - self.estimate)
+            self.tenant = None
+
+    def finish(self, answer: str, usage, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build, cache and account the result of a completed model call"""
+        result = {
+            "answer": answer,
+            "meta": {
+                "agent": self.agent,
+                "model": self.model,
+                "tokens": usage.total_tokens if usage else 0,
+                "prompt_tokens": usage.prompt_tokens if usage else 0,
+                "completion_tokens": usage.completion_tokens if usage else 0
+            }
+        }
+        if info and (info["attempts"] > 1 or info["hedged"]):
+            result["meta"].update(info)
+        if self.suggestion:
+            result["meta"]["suggestion"] = self.suggestion
+        cache.store(self.key, self.temperature, result)
+        tokens.record_usage(result["meta"])
+        self.settle(result["meta"]["tokens"])
+        return self._done(result)
+
+    def shared(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Result of an identical call already in flight that this one joined instead of calling the model"""
+        return self._done({
+            "answer": result["answer"],
+            "meta": {"agent": self.agent, "model": self.model, "tokens": 0, "cached": True, "coalesced": True}
+        })
+
+    def fallback(self, error: Exception) -> Dict[str, Any]:
+        """Answer for a degraded model: the last cached answer, else AGENTS_FALLBACK_ANSWER"""
+        result = cache.stale_lookup(self.key)
+        if result is not None:
+            result["meta"].update(fallback=True, degraded=str(error))
+            return self._done(result)
+        answer = os.getenv(
+            "AGENTS_FALLBACK_ANSWER",
+            "The {agent} agent is temporarily unavailable. Please try again shortly."
+        ).format(agent=self.agent)
+        return self._done({
+            "answer": answer,
+            "meta": {"agent": self.agent, "model": self.model, "tokens": 0, "error": str(error), "fallback": True}
+        })
+
+    def _done(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        meta = result["meta"]
+        meta["latency_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        if self.first_token is not None:
+            meta["ttft_ms"] = round((self.first_token - self.started) * 1000, 1)
+        meta["prompt_estimate"] = self.estimate
+        if self.trimmed:
+            meta["trimmed"] = True
+        if self.record:
+            evidence.record(self.question, result, self.system_prompt)
+        metrics.record(result)
+        return result
+
+
+def complete(agent: str, system_prompt: str, question: str, retries: Optional[int] = None,
+             backoff: Optional[float] = None, fallback: bool = False, record: bool = True) -> Dict[str, Any]:
+    """Answer one question through the cache and the resilient call pipeline
+
+    Provider errors propagate unless ``fallback`` is set, in which case a degraded
+    model (open circuit, retries or deadline exhausted) yields the fallback answer.
+    ``record=False`` keeps the answer out of the evidence log (see _Call).
+    """
+    call = _Call(agent, system_prompt, question, record)
+    result = call.cached()
+    if result is not None:
+        return result
+    request = call.request()
+
+    def upstream() -> Dict[str, Any]:
+        call.acquire()
+        client = get_client()
+        try:
+            response, info = resilience.call(
+                call.model, lambda timeout: client.chat.completions.create(**request, timeout=timeout),
+                retries=retries, backoff=backoff
+            )
+        except Exception:
+            call.settle(0)
+            raise
+        return call.finish(response.choices[0].message.content, response.usage, info)
+
+    try:
+        result, shared = limiter.single_flight(call.key, upstream)
+    except Exception as e:
+        if fallback and resilience.degraded(e):
+            return call.fallback(e)
+        raise
+    return call.shared(result) if shared else result
+
+
+async def acomplete(agent: str, system_prompt: str, question: str, retries: Optional[int] = None,
+                    backoff: Optional[float] = None, fallback: bool = False, record: bool = True) -> Dict[str, Any]:
+    """Async version of complete"""
+    call = _Call(agent, system_prompt, question, record)
+    result = call.cached()
+    if result is not None:
+        return result
+    request = call.request()
+
+    async def upstream() -> Dict[str, Any]:
+        await call.aacquire()
+        client = get_async_client()
+        try:
+            response, info = await resilience.acall(
+                call.model, lambda timeout: client.chat.completions.create(**request, timeout=timeout),
+                retries=retries, backoff=backoff
+            )
+        except BaseException:
+            call.settle(0)
+            raise
+        return call.finish(response.choices[0].message.content, response.usage, info)
+
+    try:
+        result, shared = await limiter.asingle_flight(call.key, upstream)
+    except Exception as e:
+        if fallback and resilience.degraded(e):
+            return call.fallback(e)
+        raise
+    return call.shared(result) if shared else result
+
+
+def run_agent(agent: str, system_prompt: str, question: str) -> Dict[str, Any]:
+    """Send one question to the model on behalf of an agent"""
+    if not os.getenv("OPENAI_API_KEY"):
+        return unconfigured_result(agent)
+    started = time.perf_counter()
+    try:
+        return complete(agent, system_prompt, question, fallback=True)
+    except Exception as e:
+        return failed(agent, e, started)
+
+
+async def arun_agent(agent: str, system_prompt: str, question: str) -> Dict[str, Any]:
+    """Async version of run_agent using the pooled AsyncOpenAI client"""
+    if not os.getenv("OPENAI_API_KEY"):
+        return unconfigured_result(agent)
+    started = time.perf_counter()
+    try:
+        return await acomplete(agent, system_prompt, question, fallback=True)
+    except Exception as e:
+        return failed(agent, e, started)
+
+
+class AgentStream:
+    """Iterator over answer chunks; ``answer`` and ``meta`` are complete once it is exhausted"""
+
+    def __init__(self, agent: str, system_prompt: str, question: str,
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.agent = agent
+        self.answer = ""
+        self.meta: Dict[str, Any] = {"agent": agent, "tokens": 0}
+        self._on_complete = on_complete
+        self._chunks = self._generate(system_prompt, question)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._chunks
+
+    def result(self) -> Dict[str, Any]:
+        """Consume the rest of the stream and return it as a regular agent result"""
+        for _ in self._chunks:
+            pass
+        return {"answer": self.answer, "meta": self.meta}
+
+    def _finish(self, result: Dict[str, Any]) -> None:
+        self.answer, self.meta = result["answer"], result["meta"]
+        if self._on_complete:
+            self._on_complete(result)
+
+    def _generate(self, system_prompt: str, question: str) -> Iterator[str]:
+        if not os.getenv("OPENAI_API_KEY"):
+            result = unconfigured_result(self.agent)
+            yield result["answer"]
+            self._finish(result)
+            return
+
+        call = _Call(self.agent, system_prompt, question)
+        cached = call.cached()
+        if cached is not None:
+            yield cached["answer"]
+            self._finish(cached)
+            return
+
+        parts: List[str] = []
+        usage = info = None
+        try:
+            request = call.request(stream=True, stream_options={"include_usage": True})
+            call.acquire()
+            client = get_client()
+            try:
+                # The pipeline covers opening the stream; chunks then arrive within the read timeout
+                stream, info = resilience.call(
+                    call.model, lambda timeout: client.chat.completions.create(**request, timeout=timeout)
+                )
+            except Exception as e:
+                call.settle(0)
+                if not resilience.degraded(e):
+                    raise
+                result = call.fallback(e)
+                yield result["answer"]
+                self._finish(result)
+                return
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if call.first_token is None:
+                            call.first_token = time.perf_counter()
+                        parts.append(delta)
+                        yield delta
+        except Exception as e:
+            call.settle(usage.total_tokens if usage else 0)
+            result = failed(self.agent, e, call.started)
+            yield ("\n\n" if parts else "") + result["answer"]
+            self._finish(result)
+            return
+
+        self._finish(call.finish("".join(parts), usage, info))
+
+
+def stream_agent(agent: str, system_prompt: str, question: str,
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> AgentStream:
+    """Streaming version of run_agent; iterate for chunks, then read ``meta``"""
+    return AgentStream(agent, system_prompt, question, on_complete)
@@ -0,0 +1,312 @@
+"""Semantic answer reuse - local vector index over past questions and answers from the evidence log
+
+Every answered question in the evidence log (GHC_DT_EVIDENCE_LOG) is embedded
+with a local model and appended to an index under AGENTS_SEMANTIC_INDEX.
+Before a model call the runtime looks up the nearest earlier question from the
+same agent asked under the same system prompt (so with the same state and
+conversation rendered into it). With AGENTS_SEMANTIC=reuse a match at or above
+AGENTS_SEMANTIC_THRESHOLD whose numbers are exactly the question's numbers
+("ZEC at 4%" never reuses "ZEC at 5%") is served instead of calling the model.
+With AGENTS_SEMANTIC=suggest the model is still called and the match is
+attached as meta['suggestion']::
+
+    index = SemanticIndex("semantic-index")
+    index.update("evidence.jsonl")            # only reads lines added since the last update
+    index.search("What is our cash runway?", agent="finance", k=3)
+
+Index files are append-only. ``vectors.f32``, ``offsets.i64``, ``agents.u16`` and
+``prompts.u64`` are memory-mapped, so opening an index only reads ``state.json``.
+Search is a brute-force dot product over the normalized vectors. The shared
+index catches up with the evidence log on a background thread, never on the
+request path.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import logging
+import threading
+from typing import Dict, Any, List, Iterable, Optional
+
+import numpy as np
+
+from .audit import read_new
+from .evidence import prompt_hash
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Bump when the index layout changes; older indexes are rebuilt
+FORMAT_VERSION = 2
+
+
+def numbers(text: str) -> List[str]:
+    """Numeric tokens of a text, in order ("1,500" and "1500" are the same number)"""
+    return [token.replace(",", "") for token in _NUMBER.findall(text)]
+
+
+def _prompt_key(value: Optional[str]) -> int:
+    # Entries logged without a prompt hash get 0, which no prompt maps to
+    return (int(value, 16) or 1) if value else 0
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder (words, word pairs and character trigrams); no model download, stable across runs"""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.array([zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)],
+                              dtype=np.uint32)
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dim, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency, loaded on first use)"""
+
+    def __init__(self, model: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self._model = SentenceTransformer(model)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers-{model}"
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self._model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+def get_embedder(spec: Optional[str] = None):
+    """Embedder from AGENTS_SEMANTIC_EMBEDDER: ``hashing[:dim]``, ``sentence-transformers[:model]`` or ``module:factory``
+
+    An embedder is any callable mapping a list of texts to L2-normalized float32
+    rows, with ``name`` and ``dim`` attributes. The index is rebuilt whenever
+    the name or dimension changes.
+    """
+    spec = spec or os.getenv("AGENTS_SEMANTIC_EMBEDDER", "hashing")
+    kind, _, arg = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg or 512))
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedder(arg or "all-MiniLM-L6-v2")
+    import importlib
+    return getattr(importlib.import_module(kind), arg)()
+
+
+class SemanticIndex:
+    """Append-only, memory-mapped embedding index of answered questions kept in ``directory``
+
+    One process should write to a directory at a time. Other processes can read
+    it, and they pick up new rows the next time they call ``update``.
+    """
+
+    def __init__(self, directory: str, embedder=None):
+        self.directory = directory
+        self.embedder = embedder or get_embedder()
+        # _lock guards the mapped arrays searches read; _write_lock serializes appends
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        state = {}
+        if os.path.exists(self._path("state.json")):
+            with open(self._path("state.json")) as f:
+                state = json.load(f)
+        if (state.get("embedder") != self.embedder.name or state.get("dim") != self.embedder.dim
+                or state.get("format") != FORMAT_VERSION):
+            state = {"format": FORMAT_VERSION, "embedder": self.embedder.name, "dim": self.embedder.dim,
+                     "rows": 0, "bytes": 0, "agents": [], "progress": {}}
+        self.state = state
+        self._map()
+
+    def _map(self) -> None:
+        rows, dim = self.state["rows"], self.state["dim"]
+        if rows == 0:
+            arrays = (np.empty((0, dim), dtype=np.float32), np.empty(0, dtype=np.int64),
+                      np.empty(0, dtype=np.uint16), np.empty(0, dtype=np.uint64))
+        else:
+            arrays = (
+                np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dim)),
+                np.memmap(self._path("offsets.i64"), dtype=np.int64, mode="r", shape=(rows,)),
+                np.memmap(self._path("agents.u16"), dtype=np.uint16, mode="r", shape=(rows,)),
+                np.memmap(self._path("prompts.u64"), dtype=np.uint64, mode="r", shape=(rows,)),
+            )
+        with self._lock:
+            self._vectors, self._offsets, self._agents, self._prompts = arrays
+            self._names = list(self.state["agents"])
+
+    def __len__(self) -> int:
+        return self.state["rows"]
+
+    def _append(self, name: str, data: bytes, size: int) -> None:
+        # Drop anything past the last committed size (an update interrupted before saving state.json)
+        with open(self._path(name), "ab") as f:
+            f.truncate(size)
+            f.write(data)
+
+    def add(self, entries: Iterable[Dict[str, Any]], batch_size: int = 256,
+            progress: Optional[Dict[str, int]] = None) -> int:
+        """Embed and append entries with ``agent``, ``question``, ``answer`` and ``prompt_hash``; returns rows added"""
+        with self._write_lock:
+            added = 0
+            batch: List[Dict[str, Any]] = []
+            for entry in entries:
+                if entry.get("cached") or not entry.get("question") or not entry.get("answer"):
+                    continue
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    added += self._add_batch(batch)
+                    batch = []
+            if batch:
+                added += self._add_batch(batch)
+            if progress is not None:
+                self.state["progress"] = progress
+            self._save()
+            return added
+
+    def _add_batch(self, batch: List[Dict[str, Any]]) -> int:
+        state = self.state
+        rows, size = state["rows"], state["bytes"]
+        vectors = self.embedder([entry["question"] for entry in batch]).astype(np.float32)
+
+        lines, offsets, agents, prompts = [], [], [], []
+        for entry in batch:
+            if entry["agent"] not in state["agents"]:
+                state["agents"].append(entry["agent"])
+            line = json.dumps({key: entry.get(key) for key in ("timestamp", "agent", "model", "question", "answer")},
+                              ensure_ascii=False).encode("utf-8") + b"\n"
+            offsets.append(size)
+            agents.append(state["agents"].index(entry["agent"]))
+            prompts.append(_prompt_key(entry.get("prompt_hash")))
+            lines.append(line)
+            size += len(line)
+
+        self._append("vectors.f32", vectors.tobytes(), rows * state["dim"] * 4)
+        self._append("offsets.i64", np.array(offsets, dtype=np.int64).tobytes(), rows * 8)
+        self._append("agents.u16", np.array(agents, dtype=np.uint16).tobytes(), rows * 2)
+        self._append("prompts.u64", np.array(prompts, dtype=np.uint64).tobytes(), rows * 8)
+        self._append("rows.jsonl", b"".join(lines), state["bytes"])
+        state["rows"], state["bytes"] = rows + len(batch), size
+        return len(batch)
+
+    def _save(self) -> None:
+        tmp = self._path("state.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self._path("state.json"))
+        self._map()
+
+    def update(self, log_path: Optional[str] = None) -> int:
+        """Index evidence entries written since the last update; returns rows added"""
+        log_path = log_path or os.getenv("GHC_DT_EVIDENCE_LOG")
+        if not log_path:
+            return 0
+        with self._write_lock:
+            progress = dict(self.state["progress"])
+            return self.add(list(read_new(log_path, progress)), progress=progress)
+
+    def search(self, question: str, agent: Optional[str] = None, k: int = 3,
+               system_prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The ``k`` most similar indexed questions, best first, with their ``score``
+
+        ``agent`` and ``system_prompt`` restrict it to answers by that agent under exactly that prompt.
+        """
+        with self._lock:
+            vectors, offsets, agents, prompts = self._vectors, self._offsets, self._agents, self._prompts
+            names = self._names
+        if not len(vectors):
+            return []
+        scores = vectors @ self.embedder([question])[0]
+        if agent is not None:
+            if agent not in names:
+                return []
+            scores = np.where(agents == names.index(agent), scores, -np.inf)
+        if system_prompt is not None:
+            scores = np.where(prompts == np.uint64(_prompt_key(prompt_hash(system_prompt))), scores, -np.inf)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        matches = []
+        with open(self._path("rows.jsonl"), "rb") as f:
+            for row in best:
+                if not np.isfinite(scores[row]):
+                    break
+                f.seek(int(offsets[row]))
+                matches.append({**json.loads(f.readline()), "score": round(float(scores[row]), 4)})
+        return matches
+
+
+_lock = threading.Lock()
+_index: Optional[SemanticIndex] = None
+_updated = 0.0
+_refreshing = False
+
+
+def _refresh(index: SemanticIndex) -> None:
+    global _refreshing
+    try:
+        index.update()
+    except Exception:
+        logger.exception("Semantic index refresh failed")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def get_index() -> Optional[SemanticIndex]:
+    """Process-wide index at AGENTS_SEMANTIC_INDEX (None when unset)
+
+    At most every AGENTS_SEMANTIC_REFRESH seconds a background thread indexes
+    new evidence log entries; callers never wait for it.
+    """
+    global _index, _updated, _refreshing
+    directory = os.getenv("AGENTS_SEMANTIC_INDEX")
+    if not directory:
+        return None
+    with _lock:
+        if _index is None or _index.directory != directory:
+            _index, _updated = SemanticIndex(directory), 0.0
+        index = _index
+        refresh = not _refreshing and time.monotonic() - _updated >= float(os.getenv("AGENTS_SEMANTIC_REFRESH", "30"))
+        if refresh:
+            _updated, _refreshing = time.monotonic(), True
+    if refresh:
+        threading.Thread(target=_refresh, args=(index,), name="semantic-index", daemon=True).start()
+    return index
+
+
+def match(agent: str, question: str, system_prompt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Best earlier answer by ``agent`` under the same system prompt to a question at least
+    AGENTS_SEMANTIC_THRESHOLD similar and with the same numbers, if any"""
+    index = get_index()
+    if index is None:
+        return None
+    threshold = float(os.getenv("AGENTS_SEMANTIC_THRESHOLD", "0.92"))
+    wanted = numbers(question)
+    for found in index.search(question, agent=agent, k=5, system_prompt=system_prompt):
+        if found["score"] < threshold:
+            break
+        if numbers(found["question"]) == wanted:
+            return found
+    return None
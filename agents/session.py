@@ -0,0 +1,249 @@
+"""Agent sessions - versioned shared state, memoized system prompts and rolling conversation history
+
+A Session carries the state dict the agents render into their system prompts.
+Every change bumps its version, and prompts are rendered once per agent and
+version. Turns are kept in a bounded history. Once it grows past
+AGENTS_SESSION_HISTORY_TOKENS, older turns are folded into a running summary
+and the newest AGENTS_SESSION_KEEP_TURNS are kept verbatim. Sessions persist
+in SQLite (AGENTS_SESSION_DB, default agent_sessions.db) on every turn and
+state change, so a conversation survives restarts::
+
+    session = load_session("ceo-42", {"phase": "Phase 2"})
+    ask(session, "Where are we on cash runway?")
+    session.update(zec_rate=5)
+    ask(session, "And at 5%?")        # sees the previous turn and the new rate
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from . import agent_module, get_agent, tokens
+from .runtime import run_agent, arun_agent, stream_agent, complete, AgentStream
+
+Turn = Dict[str, str]
+Summarizer = Callable[[str, List[Turn]], str]
+
+SUMMARY_MAX_TOKENS = 400
+
+
+def extractive_summary(summary: str, turns: List[Turn]) -> str:
+    """Fold turns into the summary using each question and the first sentence of its answer (no model call)"""
+    notes = []
+    for turn in turns:
+        answer = turn["answer"].strip().split("\n")[0]
+        answer = answer.split(". ")[0][:200]
+        notes.append(f"[{turn['agent']}] Q: {turn['question'][:120]} A: {answer}")
+    return tokens.trim("\n".join(filter(None, [summary] + notes)), SUMMARY_MAX_TOKENS)
+
+
+def llm_summary(summary: str, turns: List[Turn]) -> str:
+    """Fold turns into the summary with the CEO twin's model, falling back to the extractive summary"""
+    transcript = "\n".join(f"[{turn['agent']}] Q: {turn['question']}\nA: {turn['answer']}" for turn in turns)
+    try:
+        result = complete(
+            "ghc_dt",
+            "Update the running summary of an executive conversation. Keep decisions, figures and open "
+            f"questions; at most {SUMMARY_MAX_TOKENS // 2} words.",
+            f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{transcript}",
+            record=False  # not a ghc_dt answer: keep it out of the evidence log and semantic reuse
+        )
+        return result["answer"].strip()
+    except Exception:
+        return extractive_summary(summary, turns)
+
+
+def _summarizer() -> Summarizer:
+    return llm_summary if os.getenv("AGENTS_SESSION_SUMMARIZER") == "llm" else extractive_summary
+
+
+class Session:
+    """Versioned agent state plus conversation history; ``key`` identifies one version of it
+
+    Sessions from ``load_session`` are saved to their ``store`` on every turn and
+    state change; one built directly has no store until one is assigned.
+    """
+
+    __slots__ = ("session_id", "version", "_state", "history", "summary", "summarizer", "store", "_prompts")
+
+    def __init__(self, session_id: str, state: Optional[Dict[str, Any]] = None, version: int = 0,
+                 history: Optional[List[Turn]] = None, summary: str = "",
+                 summarizer: Optional[Summarizer] = None, store: Optional["SessionStore"] = None):
+        self.session_id = session_id
+        self.version = version
+        self._state = MappingProxyType(dict(state or {}))
+        self.history: List[Turn] = list(history or [])
+        self.summary = summary
+        self.summarizer = summarizer
+        self.store = store
+        self._prompts: Dict[Tuple[str, int], str] = {}
+
+    @property
+    def state(self) -> MappingProxyType:
+        """Read-only view of the current state; change it with ``update``"""
+        return self._state
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        """Immutable (session_id, version) snapshot, e.g. for caching on the current state"""
+        return self.session_id, self.version
+
+    def update(self, **changes) -> int:
+        """Change state values; bumps the version (and drops memoized prompts) and saves only if something changed"""
+        if all(key in self._state and self._state[key] == value for key, value in changes.items()):
+            return self.version
+        self._state = MappingProxyType({**self._state, **changes})
+        self.version += 1
+        self._prompts.clear()
+        self.save()
+        return self.version
+
+    def save(self) -> None:
+        """Write the session to its store, if it has one"""
+        if self.store is not None:
+            self.store.save(self)
+
+    def system_prompt(self, agent: str) -> str:
+        """The agent's system prompt for the current state, rendered once per version"""
+        key = (agent, self.version)
+        prompt = self._prompts.get(key)
+        if prompt is None:
+            prompt = self._prompts[key] = agent_module(agent).system_prompt(dict(self._state))
+        return prompt
+
+    def prompt(self, agent: str) -> str:
+        """System prompt plus the conversation summary and recent turns"""
+        prompt = self.system_prompt(agent)
+        if not self.summary and not self.history:
+            return prompt
+        lines = [f"Earlier in this conversation: {self.summary}"] if self.summary else []
+        for turn in self.history:
+            lines.append(f"User: {turn['question']}\nAssistant ({turn['agent']}): {turn['answer']}")
+        return prompt + "\n\nConversation so far:\n" + "\n\n".join(lines)
+
+    def add_turn(self, agent: str, question: str, answer: str) -> None:
+        """Append a turn and summarize older turns once the history passes its token budget"""
+        self.history.append({"agent": agent, "question": question, "answer": answer})
+        limit = int(os.getenv("AGENTS_SESSION_HISTORY_TOKENS", "1500"))
+        keep = int(os.getenv("AGENTS_SESSION_KEEP_TURNS", "4"))
+        size = sum(tokens.count_tokens(turn["question"] + turn["answer"]) for turn in self.history)
+        if size > limit and len(self.history) > keep:
+            cut = len(self.history) - keep
+            older, self.history = self.history[:cut], self.history[cut:]
+            self.summary = (self.summarizer or _summarizer())(self.summary, older)
+
+    def to_row(self) -> Tuple[str, int, str, str, str]:
+        return (self.session_id, self.version, json.dumps(dict(self._state)), self.summary, json.dumps(self.history))
+
+
+class SessionStore:
+    """SQLite persistence for sessions (``path`` defaults to an in-memory database)"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY, version INTEGER NOT NULL, state TEXT NOT NULL,
+                summary TEXT NOT NULL, history TEXT NOT NULL, updated REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def load(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, state, summary, history FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Session(session_id, json.loads(row[1]), row[0], json.loads(row[3]), row[2], store=self)
+
+    def save(self, session: Session) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, version, state, summary, history, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)", session.to_row() + (time.time(),)
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+_lock = threading.Lock()
+_store: Optional[SessionStore] = None
+# Live sessions in this process, least recently used first (AGENTS_SESSION_LIVE caps them)
+_sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+
+def get_store(path: Optional[str] = None) -> SessionStore:
+    """Process-wide session store at ``path``, else AGENTS_SESSION_DB, else agent_sessions.db
+
+    The first call opens it; ``:memory:`` keeps sessions for this process only.
+    """
+    global _store
+    with _lock:
+        if _store is None:
+            _store = SessionStore(path or os.getenv("AGENTS_SESSION_DB") or "agent_sessions.db")
+    return _store
+
+
+def load_session(session_id: str, state: Optional[Dict[str, Any]] = None) -> Session:
+    """The live session for ``session_id``: from this process, else the store, else a new one with ``state``"""
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is not None:
+            _sessions.move_to_end(session_id)
+            return session
+    store = get_store()
+    session = store.load(session_id) or Session(session_id, state, store=store)
+    with _lock:
+        session = _sessions.setdefault(session_id, session)
+        while len(_sessions) > int(os.getenv("AGENTS_SESSION_LIVE", "256")):
+            _sessions.popitem(last=False)
+    return session
+
+
+def _record(session: Session, agent: str, question: str, result: Dict[str, Any]) -> None:
+    if not result["meta"].get("error"):
+        session.add_turn(agent, question, result["answer"])
+        session.save()
+
+
+# Agents that orchestrate others; they get the session prompt as their base prompt instead
+ORCHESTRATORS = ("ghc_dt",)
+
+
+def ask(session: Session, question: str, agent: str = "ghc_dt") -> Dict[str, Any]:
+    """Answer within a session: the agent sees the session state and conversation, and the turn is saved"""
+    if agent in ORCHESTRATORS:
+        result = get_agent(agent)(question, dict(session.state), prompt=session.prompt(agent))
+    else:
+        result = run_agent(agent, session.prompt(agent), question)
+    _record(session, agent, question, result)
+    return result
+
+
+async def aask(session: Session, question: str, agent: str = "ghc_dt") -> Dict[str, Any]:
+    """Async version of ask"""
+    if agent in ORCHESTRATORS:
+        result = await get_agent(agent, "arun")(question, dict(session.state), prompt=session.prompt(agent))
+    else:
+        result = await arun_agent(agent, session.prompt(agent), question)
+    _record(session, agent, question, result)
+    return result
+
+
+def stream(session: Session, question: str, agent: str = "ghc_dt") -> AgentStream:
+    """Streaming version of ask; the turn is saved once the stream is exhausted"""
+    if agent in ORCHESTRATORS:
+        return get_agent(agent, "stream")(question, dict(session.state), prompt=session.prompt(agent),
+                                          on_complete=lambda result: _record(session, agent, question, result))
+    return stream_agent(agent, session.prompt(agent), question,
+                        lambda result: _record(session, agent, question, result))
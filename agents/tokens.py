@@ -0,0 +1,182 @@
+"""Token accounting - local prompt estimates, prompt trimming and per-agent/per-session budgets"""
+import os
+import math
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, Iterator
+
+# Chat framing: ~4 tokens per message plus 3 priming the reply
+_MESSAGE_OVERHEAD = 11
+
+_session: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("agents_session", default=None)
+
+
+class BudgetExceeded(Exception):
+    """Raised before a call that would exceed an agent or session token budget"""
+
+
+@contextmanager
+def use_session(session_id: Optional[str]) -> Iterator[None]:
+    """Attribute agent calls made inside the block to ``session_id``"""
+    token = _session.set(session_id)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def current_session() -> Optional[str]:
+    return _session.get()
+
+
+@lru_cache(maxsize=16)
+def _encoder(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Token count via tiktoken when installed, otherwise ~4 characters per token"""
+    encoder = _encoder(model)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def estimate_prompt(system_prompt: str, question: str, model: str = "gpt-4o-mini") -> int:
+    """Estimated prompt tokens for a system prompt plus one question"""
+    return count_tokens(system_prompt, model) + count_tokens(question, model) + _MESSAGE_OVERHEAD
+
+
+def trim(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    """Shorten ``text`` to about ``max_tokens``, keeping its head and tail"""
+    tokens = count_tokens(text, model)
+    if tokens <= max_tokens:
+        return text
+    marker = f"\n[... {tokens - max_tokens} tokens trimmed ...]\n"
+    keep = max(int(len(text) * max_tokens / tokens) - len(marker), 0)
+    while True:
+        head = keep * 2 // 3
+        trimmed = text[:head] + marker + text[len(text) - (keep - head):] if keep else marker.strip()
+        if keep == 0 or count_tokens(trimmed, model) <= max_tokens:
+            return trimmed
+        keep = keep * 9 // 10
+
+
+def _env_limit(agent: str, suffix: str) -> int:
+    value = os.getenv(f"{agent.upper()}_{suffix}") or os.getenv(f"AGENTS_{suffix}")
+    return int(value) if value else 0
+
+
+def max_prompt_tokens(agent: str) -> int:
+    """Prompt size limit: <AGENT>_MAX_PROMPT_TOKENS, then AGENTS_MAX_PROMPT_TOKENS (default 8000, 0 = off)"""
+    value = os.getenv(f"{agent.upper()}_MAX_PROMPT_TOKENS") or os.getenv("AGENTS_MAX_PROMPT_TOKENS", "8000")
+    return int(value)
+
+
+def fit_prompt(agent: str, model: str, system_prompt: str, question: str) -> Tuple[str, str, int, bool]:
+    """Trim an oversized prompt to the agent's limit
+
+    The system prompt (rendered state context) is cut first, down to half the
+    limit, then the question. Returns (system_prompt, question, estimate, trimmed).
+    """
+    estimate = estimate_prompt(system_prompt, question, model)
+    limit = max_prompt_tokens(agent)
+    if not limit or estimate <= limit:
+        return system_prompt, question, estimate, False
+
+    question_tokens = count_tokens(question, model)
+    system_budget = max(limit - question_tokens - _MESSAGE_OVERHEAD, limit // 2)
+    system_prompt = trim(system_prompt, system_budget, model)
+    question = trim(question, limit - count_tokens(system_prompt, model) - _MESSAGE_OVERHEAD, model)
+    return system_prompt, question, estimate_prompt(system_prompt, question, model), True
+
+
+class Ledger:
+    """Running token totals per agent and session, plus spend inside the budget window"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals: Dict[str, Dict[str, int]] = {}
+        self._window_start = time.time()
+        self._agent_spend: Dict[str, int] = {}
+        self._session_spend: Dict[str, int] = {}
+
+    def _roll_window(self) -> None:
+        window = float(os.getenv("AGENTS_TOKEN_BUDGET_WINDOW", "86400"))
+        if time.time() - self._window_start >= window:
+            self._window_start = time.time()
+            self._agent_spend.clear()
+            self._session_spend.clear()
+
+    def check(self, agent: str, estimate: int, session: Optional[str] = None) -> None:
+        """Raise BudgetExceeded if ``estimate`` more prompt tokens would break a budget
+
+        Budgets: <AGENT>_TOKEN_BUDGET / AGENTS_TOKEN_BUDGET per agent and
+        AGENTS_SESSION_TOKEN_BUDGET per session, over AGENTS_TOKEN_BUDGET_WINDOW
+        seconds (default one day). Unset or 0 means unlimited.
+        """
+        agent_budget = _env_limit(agent, "TOKEN_BUDGET")
+        session_budget = int(os.getenv("AGENTS_SESSION_TOKEN_BUDGET", "0"))
+        with self._lock:
+            self._roll_window()
+            spent = self._agent_spend.get(agent, 0)
+            if agent_budget and spent + estimate > agent_budget:
+                raise BudgetExceeded(f"{agent} token budget exhausted ({spent:,}/{agent_budget:,} tokens used)")
+            if session and session_budget:
+                spent = self._session_spend.get(session, 0)
+                if spent + estimate > session_budget:
+                    raise BudgetExceeded(f"Session token budget exhausted ({spent:,}/{session_budget:,} tokens used)")
+
+    def record(self, meta: Dict[str, Any], session: Optional[str] = None) -> None:
+        """Add the tokens reported in a result's meta"""
+        agent = meta["agent"]
+        with self._lock:
+            self._roll_window()
+            totals = self.totals.setdefault(
+                agent, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "tokens": 0}
+            )
+            totals["calls"] += 1
+            for field in ("prompt_tokens", "completion_tokens", "tokens"):
+                totals[field] += meta.get(field, 0)
+            self._agent_spend[agent] = self._agent_spend.get(agent, 0) + meta.get("tokens", 0)
+            if session:
+                self._session_spend[session] = self._session_spend.get(session, 0) + meta.get("tokens", 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {agent: dict(totals) for agent, totals in self.totals.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.totals.clear()
+            self._agent_spend.clear()
+            self._session_spend.clear()
+            self._window_start = time.time()
+
+
+ledger = Ledger()
+
+
+def check_budget(agent: str, estimate: int) -> None:
+    """Budget check for the current session"""
+    ledger.check(agent, estimate, current_session())
+
+
+def record_usage(meta: Dict[str, Any]) -> None:
+    """Record a completed call against the current session"""
+    ledger.record(meta, current_session())
+
+
+def usage_totals() -> Dict[str, Dict[str, int]]:
+    """Running totals per agent: calls, prompt_tokens, completion_tokens, tokens"""
+    return ledger.snapshot()
@@ -0,0 +1,35 @@
+"""Ground Control benchmarks - agent load against a mock model server, dashboard render timings
+and synthetic data generation/rollup ingest at scale
+
+Run everything and write the results as JSON::
+
+    python -m benchmarks --output benchmark-results.json
+    python -m benchmarks --baseline benchmark-results.json   # exit 1 on regressions
+"""
+import math
+from typing import Dict, Any, List, Optional
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(len(ordered) * p / 100) - 1, 0), len(ordered) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """Throughput and latency summary (milliseconds) of one benchmark run"""
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+    }
@@ -0,0 +1,93 @@
+"""Run the benchmark suite and write the results as JSON"""
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, List
+
+from . import bench_agents, bench_dashboard, bench_data
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def regressions(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """p95 latencies (and throughput) that got worse than ``baseline`` by more than ``tolerance``"""
+    found = []
+    for agent, modes in current.get("agents", {}).get("agents", {}).items():
+        for mode, stats in modes.items():
+            before = baseline.get("agents", {}).get("agents", {}).get(agent, {}).get(mode)
+            if not before:
+                continue
+            if before["p95_ms"] and stats["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                found.append(f"{agent}/{mode} p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+            if before["throughput_rps"] and (stats["throughput_rps"] or 0) < before["throughput_rps"] * (1 - tolerance):
+                found.append(f"{agent}/{mode} throughput {before['throughput_rps']} -> {stats['throughput_rps']} req/s")
+    for view, stats in current.get("dashboard", {}).get("views", {}).items():
+        before = baseline.get("dashboard", {}).get("views", {}).get(view)
+        if before and before["warm"]["p95_ms"] and stats["warm"]["p95_ms"] > before["warm"]["p95_ms"] * (1 + tolerance):
+            found.append(f"{view} warm p95 {before['warm']['p95_ms']}ms -> {stats['warm']['p95_ms']}ms")
+    before, after = baseline.get("data"), current.get("data")
+    if before and after and before["settings"] == after["settings"]:
+        for field in ("generate_s", "rollup_ingest_s"):
+            if after[field] > before[field] * (1 + tolerance):
+                found.append(f"data {field} {before[field]}s -> {after[field]}s")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ground Control benchmarks")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON results")
+    parser.add_argument("--requests", type=int, default=50, help="requests per agent and load mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads / in-flight tasks")
+    parser.add_argument("--latency", type=float, default=0.05, help="injected model latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- injected latency jitter (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of failing model calls")
+    parser.add_argument("--agents", nargs="*", help="agents to benchmark (default: all)")
+    parser.add_argument("--views", nargs="*", help="dashboard views to time (default: all)")
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns per dashboard view")
+    parser.add_argument("--data-days", type=int, default=365, help="days of synthetic data to generate")
+    parser.add_argument("--orders-per-day", type=float, default=5000, help="synthetic orders per day")
+    parser.add_argument("--skip-agents", action="store_true")
+    parser.add_argument("--skip-dashboard", action="store_true")
+    parser.add_argument("--skip-data", action="store_true")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if not args.skip_agents:
+        results["agents"] = bench_agents.run(
+            args.requests, args.concurrency, args.latency, args.jitter, args.error_rate, args.agents
+        )
+    if not args.skip_dashboard:
+        results["dashboard"] = bench_dashboard.run(args.reruns, views=args.views)
+    if not args.skip_data:
+        results["data"] = bench_data.run(args.data_days, args.orders_per_day)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
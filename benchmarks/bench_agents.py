@@ -0,0 +1,114 @@
+"""Agent benchmarks - every registered agent under sequential, threaded and asyncio load
+
+The agents talk to tools/mock_openai.py through OPENAI_BASE_URL, so the numbers
+measure our own overhead (prompt building, pooling, pipeline, accounting) on
+top of a known injected model latency.
+"""
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import agents
+from agents import limiter, metrics, resilience
+from agents.client import close_clients
+from tools.mock_openai import MockSettings, serve
+
+from . import summarize
+
+QUESTION = "Summarise this week's cash position and the main operational risk."
+
+
+def _timed(agent: str, index: int) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    result = agents.dispatch(agent, f"{QUESTION} #{index}")
+    return time.perf_counter() - started, bool(result["meta"].get("error"))
+
+
+async def _atimed(agent: str, index: int) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    result = await agents.adispatch(agent, f"{QUESTION} #{index}")
+    return time.perf_counter() - started, bool(result["meta"].get("error"))
+
+
+def _summary(samples: List[Tuple[float, bool]], elapsed: float) -> Dict[str, Any]:
+    return summarize([latency for latency, _ in samples], elapsed, sum(1 for _, error in samples if error))
+
+
+def sequential(agent: str, requests: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    samples = [_timed(agent, index) for index in range(requests)]
+    return _summary(samples, time.perf_counter() - started)
+
+
+def threaded(agent: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda index: _timed(agent, index), range(requests)))
+    return _summary(samples, time.perf_counter() - started)
+
+
+def concurrent(agent: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    async def run() -> List[Tuple[float, bool]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(index: int) -> Tuple[float, bool]:
+            async with semaphore:
+                return await _atimed(agent, index)
+
+        return await asyncio.gather(*(bounded(index) for index in range(requests)))
+
+    started = time.perf_counter()
+    samples = asyncio.run(run())
+    return _summary(samples, time.perf_counter() - started)
+
+
+def run(requests: int = 50, concurrency: int = 8, latency: float = 0.05, jitter: float = 0.0,
+        error_rate: float = 0.0, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Benchmark each agent in each load mode against a fresh mock server"""
+    server = serve(settings=MockSettings(latency=latency, jitter=jitter, error_rate=error_rate))
+    overrides = {
+        "OPENAI_BASE_URL": server.url,
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "benchmark",
+        # Every request should reach the model server and nothing should be written to disk
+        "AGENTS_CACHE": "0",
+        "GHC_DT_EVIDENCE_LOG": "",
+        "GHC_DT_AGENTS": "",
+        # Measure the pipeline, not our own throttling or answer reuse
+        "AGENTS_RATE_RPM": "0",
+        "AGENTS_RATE_TPM": "0",
+        "AGENTS_RATE_GLOBAL_RPM": "0",
+        "AGENTS_RATE_GLOBAL_TPM": "0",
+        "AGENTS_SEMANTIC": "off",
+    }
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    # Pooled clients keep the base URL they were created with
+    close_clients()
+    results: Dict[str, Any] = {}
+    try:
+        for agent in names or agents.available():
+            resilience.reset()
+            limiter.reset()
+            metrics.metrics.reset()
+            results[agent] = {
+                "sequential": sequential(agent, requests),
+                "threaded": threaded(agent, requests, concurrency),
+                "asyncio": concurrent(agent, requests, concurrency),
+            }
+    finally:
+        server.shutdown()
+        close_clients()
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        limiter.reset()
+
+    return {
+        "settings": {"requests": requests, "concurrency": concurrency, "latency_s": latency,
+                     "jitter_s": jitter, "error_rate": error_rate},
+        "agents": results,
+    }
@@ -0,0 +1,51 @@
+"""Dashboard benchmarks - time streamlit_app.main() for every dashboard view with Streamlit's AppTest
+
+Each view is rendered in a fresh AppTest: the first run is cold (data loaded and
+cached), the following runs are warm reruns like the ones a user triggers.
+"""
+import os
+import time
+from typing import Dict, Any, Optional, Sequence
+
+from . import summarize
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+VIEWS = ("Executive Summary", "Operations", "Financial", "Compliance", "Analytics", "System Performance")
+
+
+def _select(app, label: str, value: str):
+    for widget in app.selectbox:
+        if widget.label == label:
+            return widget.set_value(value)
+    raise LookupError(f"No selectbox labelled {label!r}")
+
+
+def time_view(view: str, reruns: int = 5, time_range: str = "Today", timeout: float = 60.0) -> Dict[str, Any]:
+    """Cold and warm render timings of one dashboard view"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    started = time.perf_counter()
+    app.run()
+    _select(app, "Dashboard View", view)
+    _select(app, "Time Range", time_range)
+    app.run()
+    cold = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(f"{view} raised: {app.exception[0].message}")
+
+    warm = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        warm.append(time.perf_counter() - started)
+    return {"cold_ms": round(cold * 1000, 2), "warm": summarize(warm, sum(warm))}
+
+
+def run(reruns: int = 5, time_range: str = "Today", views: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Render timings for each dashboard view"""
+    return {
+        "settings": {"reruns": reruns, "time_range": time_range},
+        "views": {view: time_view(view, reruns, time_range) for view in views or VIEWS},
+    }
@@ -0,0 +1,38 @@
+"""Data benchmarks - synthetic dataset generation and rollup ingest at production-like volumes"""
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from dashboard import rollups
+from dashboard.synthetic import generate
+
+
+def run(days: int = 365, orders_per_day: float = 5000, seed: int = 0) -> Dict[str, Any]:
+    """Time ``generate`` and folding its transactions into a RollupStore"""
+    end = datetime(2025, 12, 31)
+    started = time.perf_counter()
+    data = generate(seed=seed, days=days, orders_per_day=orders_per_day, end=end)
+    generated = time.perf_counter() - started
+
+    orders = data["transactions"]
+    store = rollups.RollupStore()
+    started = time.perf_counter()
+    store.add(orders, watermark=end)
+    ingested = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for time_range in rollups.TREND_DAYS:
+        rollups.range_totals(store, time_range, end)
+        rollups.financial_trend(store, time_range, end)
+    queried = time.perf_counter() - started
+
+    return {
+        "settings": {"days": days, "orders_per_day": orders_per_day, "seed": seed},
+        "rows": {table: len(frame) for table, frame in data.items()},
+        "transactions_mb": round(orders.memory_usage(deep=True).sum() / 2 ** 20, 1),
+        "generate_s": round(generated, 3),
+        "generate_rows_per_s": round(len(orders) / generated) if generated else None,
+        "rollup_ingest_s": round(ingested, 3),
+        "rollup_ingest_rows_per_s": round(len(orders) / ingested) if ingested else None,
+        "rollup_query_ms": round(queried * 1000, 2),
+    }
@@ -0,0 +1,142 @@
+"""Alerts - append-only alert store with a local publish/subscribe interface
+
+Producers call ``AlertBus.publish``; the dashboard polls ``AlertStore.since(last_id)``
+so each refresh only reads alerts it has not shown yet. With a file path the
+store can be shared with producers running in other processes::
+
+    bus = AlertBus(AlertStore("alerts.db"))
+    bus.publish("warning", "Blue Dream stock below 3 days of sales", source="inventory")
+    bus.store.since(0)
+"""
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("info", "success", "warning", "error")
+
+
+class AlertStore:
+    """SQLite-backed append-only log of alerts; ids increase monotonically"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL, level TEXT NOT NULL, message TEXT NOT NULL, source TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS alerts_message ON alerts (message, ts);
+        """)
+
+    def append(self, level: str, message: str, source: str = "", ts: Optional[datetime] = None) -> Dict[str, Any]:
+        """Add one alert and return it with its id"""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown alert level: {level}")
+        ts = (ts or datetime.now()).isoformat(timespec="seconds")
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO alerts (ts, level, message, source) VALUES (?, ?, ?, ?)", (ts, level, message, source)
+            )
+        return {"id": cursor.lastrowid, "ts": ts, "level": level, "message": message, "source": source}
+
+    def _rows(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [dict(zip(("id", "ts", "level", "message", "source"), row)) for row in rows]
+
+    def since(self, last_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """Alerts with an id greater than ``last_id``, oldest first"""
+        return self._rows(
+            "SELECT id, ts, level, message, source FROM alerts WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+        )
+
+    def latest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The newest ``limit`` alerts, oldest first"""
+        return self._rows(
+            "SELECT id, ts, level, message, source FROM "
+            "(SELECT * FROM alerts ORDER BY id DESC LIMIT ?) ORDER BY id", (limit,)
+        )
+
+    def last_id(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM alerts").fetchone()[0]
+
+    def seen_since(self, message: str, since: datetime) -> bool:
+        """Whether ``message`` was already raised at or after ``since``"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM alerts WHERE message = ? AND ts >= ? LIMIT 1",
+                (message, since.isoformat(timespec="seconds"))
+            ).fetchone() is not None
+
+
+class AlertBus:
+    """Publish alerts into a store and fan them out to in-process subscribers"""
+
+    def __init__(self, store: Optional[AlertStore] = None):
+        self.store = store or AlertStore()
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._published = threading.Condition()
+
+    def publish(self, level: str, message: str, source: str = "",
+                dedupe_seconds: float = 0) -> Optional[Dict[str, Any]]:
+        """Append an alert and notify subscribers; with ``dedupe_seconds`` a repeat of a recent message is dropped"""
+        if dedupe_seconds and self.store.seen_since(message, datetime.now() - timedelta(seconds=dedupe_seconds)):
+            return None
+        alert = self.store.append(level, message, source)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(alert)
+            except Exception:
+                logger.exception("Alert subscriber failed")
+        with self._published:
+            self._published.notify_all()
+        return alert
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """Call ``callback(alert)`` for every alert published in this process; returns an unsubscribe function"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def wait(self, last_id: int, timeout: float) -> List[Dict[str, Any]]:
+        """Alerts newer than ``last_id``, blocking up to ``timeout`` seconds for one to be published"""
+        deadline = time.monotonic() + timeout
+        alerts = self.store.since(last_id)
+        while not alerts and time.monotonic() < deadline:
+            with self._published:
+                self._published.wait(deadline - time.monotonic())
+            alerts = self.store.since(last_id)
+        return alerts
+
+
+def check_source(bus: AlertBus, source, time_range: str = "Today", dedupe_seconds: float = 3600) -> int:
+    """Publish alerts for operations and compliance areas below the 95% threshold; returns alerts raised"""
+    raised = 0
+    for name, efficiency, _ in source.operations_status(time_range):
+        if efficiency < 95:
+            raised += bus.publish(
+                "warning", f"{name} efficiency at {efficiency}%", "operations", dedupe_seconds
+            ) is not None
+    for area, score in source.compliance_areas(time_range):
+        if score < 95:
+            raised += bus.publish(
+                "error", f"{area} compliance score at {score}%", "compliance", dedupe_seconds
+            ) is not None
+    return raised
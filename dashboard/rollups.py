@@ -0,0 +1,194 @@
+"""Rollup store - daily, weekly and monthly revenue/expense/profit buckets updated incrementally
+
+New transactions are folded into the existing buckets with an upsert, so the
+trend charts and revenue KPIs only ever read precomputed rows. ``sync`` pulls
+transactions newer than the stored watermark from a data source; rows that
+arrive later with an older timestamp are not picked up. Sources whose data is
+rebuilt wholesale expose a ``generation``; when it changes the rollups are
+rebuilt from scratch.
+"""
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from .sources import time_window
+
+GRAINS = ("day", "week", "month")
+
+# Days of history shown by the trend charts for each time range
+TREND_DAYS = {"Today": 30, "This Week": 30, "This Month": 60, "This Quarter": 120}
+
+# Buckets that make up each dashboard time range: (grain, number of buckets)
+RANGE_BUCKETS = {"Today": ("day", 1), "This Week": ("week", 1), "This Month": ("month", 1), "This Quarter": ("month", 3)}
+
+
+def bucket_start(grain: str, value: datetime) -> datetime:
+    """Start of the bucket containing ``value`` (weeks start on Monday)"""
+    day = datetime(value.year, value.month, value.day)
+    if grain == "day":
+        return day
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown grain: {grain}")
+
+
+def shift(grain: str, start: datetime, buckets: int) -> datetime:
+    """Move a bucket start by a number of buckets"""
+    if grain == "day":
+        return start + timedelta(days=buckets)
+    if grain == "week":
+        return start + timedelta(weeks=buckets)
+    months = start.year * 12 + start.month - 1 + buckets
+    return start.replace(year=months // 12, month=months % 12 + 1)
+
+
+class RollupStore:
+    """SQLite-backed rollups; ``path`` defaults to an in-memory database"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        # Held for a whole sync so concurrent syncs can't fold the same transactions in twice
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS rollups (
+                grain TEXT NOT NULL, bucket TEXT NOT NULL,
+                revenue REAL NOT NULL, expenses REAL NOT NULL, profit REAL NOT NULL,
+                transactions INTEGER NOT NULL,
+                PRIMARY KEY (grain, bucket)
+            );
+            CREATE TABLE IF NOT EXISTS watermark (id INTEGER PRIMARY KEY CHECK (id = 1), ts TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 1), value TEXT NOT NULL);
+        """)
+
+    def watermark(self) -> Optional[datetime]:
+        """Timestamp up to which transactions have been folded in"""
+        with self._lock:
+            row = self._db.execute("SELECT ts FROM watermark WHERE id = 1").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def reset(self, generation: Optional[str] = None) -> None:
+        """Drop every bucket and the watermark, e.g. because the source data was rebuilt"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM rollups")
+            self._db.execute("DELETE FROM watermark")
+            self._db.execute("DELETE FROM generation")
+            if generation is not None:
+                self._db.execute("INSERT INTO generation (id, value) VALUES (1, ?)", (generation,))
+
+    def _generation(self) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM generation WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def add(self, transactions: pd.DataFrame, watermark: Optional[datetime] = None) -> int:
+        """Fold transactions (ts, revenue, cost[, count]) into every grain; returns rows read"""
+        rows = []
+        if not transactions.empty:
+            ts = pd.to_datetime(transactions["ts"]).dt.normalize()
+            frame = pd.DataFrame({
+                "revenue": transactions["revenue"].astype(float).values,
+                "expenses": transactions["cost"].astype(float).values,
+                "transactions": transactions["count"].values if "count" in transactions else 1
+            })
+            buckets = {
+                "day": ts,
+                "week": ts - pd.to_timedelta(ts.dt.weekday, unit="D"),
+                "month": ts.dt.to_period("M").dt.start_time
+            }
+            for grain, bucket in buckets.items():
+                grouped = frame.groupby(bucket.dt.strftime("%Y-%m-%d").values).sum()
+                rows.extend(
+                    (grain, key, row.revenue, row.expenses, row.revenue - row.expenses, int(row.transactions))
+                    for key, row in zip(grouped.index, grouped.itertuples(index=False))
+                )
+
+        with self._lock, self._db:
+            self._db.executemany("""
+                INSERT INTO rollups (grain, bucket, revenue, expenses, profit, transactions)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (grain, bucket) DO UPDATE SET
+                    revenue = revenue + excluded.revenue,
+                    expenses = expenses + excluded.expenses,
+                    profit = profit + excluded.profit,
+                    transactions = transactions + excluded.transactions
+            """, rows)
+            if watermark is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO watermark (id, ts) VALUES (1, ?)", (watermark.isoformat(),)
+                )
+        return len(transactions)
+
+    def sync(self, source, now: Optional[datetime] = None, backfill_days: int = 365,
+             min_interval: float = 0.0) -> int:
+        """Pull transactions newer than the watermark from ``source``; returns rows read"""
+        with self._sync_lock:
+            if time.time() - self._last_sync < min_interval:
+                return 0
+            generation = getattr(source, "generation", None)
+            if generation is not None and generation != self._generation():
+                self.reset(generation)
+            now = now or datetime.now()
+            since = self.watermark() or now - timedelta(days=backfill_days)
+            if now <= since:
+                return 0
+            added = self.add(source.transactions(since, now), watermark=now)
+            self._last_sync = time.time()
+            return added
+
+    def series(self, grain: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DataFrame:
+        """Buckets of one grain in [start, end), indexed by bucket start"""
+        start_key = bucket_start(grain, start).strftime("%Y-%m-%d") if start else ""
+        end_key = end.strftime("%Y-%m-%d") if end else "9999"
+        with self._lock:
+            frame = pd.read_sql_query(
+                "SELECT bucket, revenue, expenses, profit, transactions FROM rollups "
+                "WHERE grain = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                self._db, params=(grain, start_key, end_key)
+            )
+        frame.index = pd.to_datetime(frame.pop("bucket"))
+        return frame
+
+    def totals(self, grain: str, start: datetime, buckets: int = 1) -> Dict[str, float]:
+        """Sum of ``buckets`` consecutive buckets starting at the bucket containing ``start``"""
+        first = bucket_start(grain, start)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(revenue), 0), COALESCE(SUM(expenses), 0), COALESCE(SUM(profit), 0), "
+                "COALESCE(SUM(transactions), 0) FROM rollups WHERE grain = ? AND bucket >= ? AND bucket < ?",
+                (grain, first.strftime("%Y-%m-%d"), shift(grain, first, buckets).strftime("%Y-%m-%d"))
+            ).fetchone()
+        return dict(zip(("revenue", "expenses", "profit", "transactions"), row))
+
+
+def range_totals(store: RollupStore, time_range: str, now: Optional[datetime] = None) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Totals for a time range and for the period before it, read from precomputed buckets"""
+    start, _ = time_window(time_range, now)
+    grain, buckets = RANGE_BUCKETS[time_range]
+    return store.totals(grain, start, buckets), store.totals(grain, shift(grain, start, -buckets), buckets)
+
+
+def revenue_trend(store: RollupStore, time_range: str, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Cumulative daily revenue over the trend window of a time range"""
+    _, end = time_window(time_range, now)
+    daily = store.series("day", end - timedelta(days=TREND_DAYS[time_range]), end)
+    return pd.DataFrame({"Daily Revenue": daily["revenue"].cumsum()}, index=daily.index)
+
+
+def financial_trend(store: RollupStore, time_range: str, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Cumulative weekly revenue, expenses and profit over the trend window of a time range"""
+    _, end = time_window(time_range, now)
+    weekly = store.series("week", end - timedelta(days=TREND_DAYS[time_range]), end)
+    return pd.DataFrame({
+        "Revenue": weekly["revenue"].cumsum(),
+        "Expenses": weekly["expenses"].cumsum(),
+        "Profit": weekly["profit"].cumsum()
+    }, index=weekly.index)
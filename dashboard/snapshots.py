@@ -0,0 +1,260 @@
+"""Executive Summary snapshots - precomputed per time range and read back memory-mapped
+
+``build`` computes everything the Executive Summary shows for one time range:
+the KPI row, revenue trend, key metrics and top products. ``write`` saves it to
+``directory``. Each table is an uncompressed Arrow IPC (Feather v2) file, so
+``load`` memory-maps it instead of parsing it. Tables keep numeric columns
+(formatting happens at render time), which pandas can take over from the
+mapped buffers without a copy; string columns are still converted. A small
+JSON manifest per time range carries the KPIs and the build time. If pyarrow
+is not installed, tables are stored as JSON instead.
+
+    builder = SnapshotBuilder("snapshots", source, store, interval=60).start()
+    snapshot = load("snapshots", "This Week", max_age=120)
+    snapshot["stale"], snapshot["tables"]["top_products"]
+
+Files are versioned per build and the manifest is swapped in last, so a reader
+never sees a half-written snapshot. Run ``python -m dashboard.snapshots`` to
+build them from a scheduler instead of the app process.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, Optional, Set
+
+import pandas as pd
+
+from . import rollups
+from .rollups import RollupStore
+
+logger = logging.getLogger(__name__)
+
+TIME_RANGES = tuple(rollups.TREND_DAYS)
+
+# Bump when the snapshot layout changes; older snapshots are then ignored
+FORMAT_VERSION = 3
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def kpis(source, store: RollupStore, time_range: str) -> Dict[str, Any]:
+    """KPI row: source KPIs with revenue, its delta vs the previous period and the profit margin from the rollups"""
+    values = source.kpis(time_range)
+    current, previous = rollups.range_totals(store, time_range)
+    values["revenue"] = int(current["revenue"])
+    values["revenue_delta"] = (
+        f"{100 * (current['revenue'] - previous['revenue']) / previous['revenue']:.1f}%" if previous["revenue"] else None
+    )
+    values["margin"] = 100 * current["profit"] / current["revenue"] if current["revenue"] else None
+    return values
+
+
+def key_metrics(source, time_range: str) -> pd.DataFrame:
+    return pd.DataFrame(source.key_metrics(time_range), columns=["Metric", "Value", "Status"])
+
+
+# Table name -> how to compute it from (source, store, time_range)
+TABLES: Dict[str, Callable[[Any, RollupStore, str], pd.DataFrame]] = {
+    "revenue_trend": lambda source, store, time_range: rollups.revenue_trend(store, time_range),
+    "key_metrics": lambda source, store, time_range: key_metrics(source, time_range),
+    "top_products": lambda source, store, time_range: source.top_products(time_range),
+}
+
+
+def build(source, store: RollupStore, time_range: str) -> Dict[str, Any]:
+    """Compute the Executive Summary for one time range"""
+    return {
+        "time_range": time_range,
+        "built_at": time.time(),
+        "kpis": kpis(source, store, time_range),
+        "tables": {name: table(source, store, time_range) for name, table in TABLES.items()},
+    }
+
+
+def _slug(time_range: str) -> str:
+    return time_range.lower().replace(" ", "_")
+
+
+def _manifest_path(directory: str, time_range: str) -> str:
+    return os.path.join(directory, f"{_slug(time_range)}.json")
+
+
+def _write_table(path: str, frame: pd.DataFrame) -> None:
+    pa = _arrow()
+    if pa is None:
+        frame.to_json(path, orient="table")
+        return
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    if path.endswith(".json"):
+        return pd.read_json(path, orient="table")
+    pa = _arrow()
+    with pa.memory_map(path, "r") as source:
+        # One block per column, so numeric columns without nulls are not copied into a consolidated block
+        return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+
+def write(directory: str, snapshot: Dict[str, Any]) -> str:
+    """Save a snapshot and atomically make it the current one for its time range; returns the manifest path"""
+    os.makedirs(directory, exist_ok=True)
+    slug = _slug(snapshot["time_range"])
+    generation = f"{int(snapshot['built_at'] * 1000)}"
+    extension = "arrow" if _arrow() is not None else "json"
+    files = {}
+    for name, frame in snapshot["tables"].items():
+        files[name] = f"{slug}.{generation}.{name}.{extension}"
+        _write_table(os.path.join(directory, files[name]), frame)
+
+    manifest = _manifest_path(directory, snapshot["time_range"])
+    with open(manifest + ".tmp", "w") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "time_range": snapshot["time_range"],
+            "built_at": snapshot["built_at"],
+            "kpis": snapshot["kpis"],
+            "tables": files,
+        }, f)
+    os.replace(manifest + ".tmp", manifest)
+
+    # Earlier builds; readers that still map them keep their data until they close it
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if parts[0] == slug and len(parts) == 4 and parts[1].isdigit() and name not in files.values():
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return manifest
+
+
+def load(directory: str, time_range: str, max_age: float = 300.0) -> Optional[Dict[str, Any]]:
+    """The current snapshot for a time range, or None if there is none (or it can't be read)
+
+    ``stale`` is set when it was built more than ``max_age`` seconds ago, and
+    ``age`` gives its age in seconds.
+    """
+    try:
+        with open(_manifest_path(directory, time_range)) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION:
+            return None
+        tables = {name: _read_table(os.path.join(directory, file)) for name, file in manifest["tables"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    age = time.time() - manifest["built_at"]
+    return {
+        "time_range": time_range,
+        "built_at": manifest["built_at"],
+        "kpis": manifest["kpis"],
+        "tables": tables,
+        "age": age,
+        "stale": age > max_age,
+    }
+
+
+class SnapshotBuilder:
+    """Rebuilds snapshots every ``interval`` seconds and on request, on one background thread"""
+
+    def __init__(self, directory: str, source, store: RollupStore, interval: float = 60.0,
+                 time_ranges: Iterable[str] = TIME_RANGES):
+        self.directory = directory
+        self.source = source
+        self.store = store
+        self.interval = interval
+        self.time_ranges = tuple(time_ranges)
+        self._lock = threading.Lock()
+        self._requested: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def build(self, time_range: str) -> Dict[str, Any]:
+        """Sync the rollups, then build and write one snapshot now"""
+        self.store.sync(self.source, min_interval=0)
+        snapshot = build(self.source, self.store, time_range)
+        write(self.directory, snapshot)
+        return snapshot
+
+    def build_all(self) -> None:
+        for time_range in self.time_ranges:
+            try:
+                self.build(time_range)
+            except Exception:
+                logger.exception("Snapshot for %s failed", time_range)
+
+    def request(self, *time_ranges: str) -> None:
+        """Rebuild these time ranges (all when none are given) as soon as possible"""
+        with self._lock:
+            self._requested.update(time_ranges or self.time_ranges)
+        self._wake.set()
+
+    def start(self) -> "SnapshotBuilder":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dashboard-snapshots", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        next_full = 0.0
+        while not self._stop.is_set():
+            self._wake.clear()
+            if time.monotonic() >= next_full:
+                self.build_all()
+                next_full = time.monotonic() + self.interval
+                with self._lock:
+                    self._requested.clear()
+            with self._lock:
+                requested, self._requested = self._requested, set()
+            for time_range in requested:
+                try:
+                    self.build(time_range)
+                except Exception:
+                    logger.exception("Snapshot for %s failed", time_range)
+            self._wake.wait(max(next_full - time.monotonic(), 0))
+
+
+def main() -> None:
+    import argparse
+
+    from .sources import get_source
+
+    parser = argparse.ArgumentParser(description="Build Executive Summary snapshots")
+    parser.add_argument("--dir", default=os.getenv("SNAPSHOT_DIR", "snapshots"), help="snapshot directory")
+    parser.add_argument("--rollup-db", default=os.getenv("ROLLUP_DB", ":memory:"), help="rollup database")
+    parser.add_argument("--every", type=float, default=0, help="rebuild every N seconds (default: once)")
+    args = parser.parse_args()
+
+    builder = SnapshotBuilder(args.dir, get_source(), RollupStore(args.rollup_db), interval=args.every)
+    while True:
+        started = time.monotonic()
+        builder.build_all()
+        print(f"{datetime.now():%H:%M:%S} built {len(builder.time_ranges)} snapshots in "
+              f"{1000 * (time.monotonic() - started):.0f}ms")
+        if not args.every:
+            return
+        time.sleep(max(args.every - (time.monotonic() - started), 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""Dashboard data sources - SQL, file and synthetic backends behind one interface
+
+Every backend answers the same questions for a ``time_range`` ("Today", "This Week",
+"This Month", "This Quarter"). The SQL and file backends read these tables:
+
+    transactions       ts, product, customer_id, revenue, cost, grams
+    production         ts, stage, units, kg
+    operations         name, efficiency, status
+    compliance_areas   area, score
+    compliance_events  date, event, status
+
+Aggregation runs inside the database; only per-day or per-group rows come back.
+"""
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = [
+    "Production Planning", "Quality Control", "Inventory Management", "Sales Analytics",
+    "Compliance Monitoring", "Supply Chain", "Customer Service", "Financial Tracking"
+]
+
+PIPELINE_STAGES = ["Raw Materials", "Processing", "Quality Check", "Packaging", "Distribution", "Retail"]
+
+
+def time_window(time_range: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """[start, end) of a dashboard time range, aligned to whole days"""
+    now = now or datetime.now()
+    today = datetime(now.year, now.month, now.day)
+    if time_range == "Today":
+        start = today
+    elif time_range == "This Week":
+        start = today - timedelta(days=today.weekday())
+    elif time_range == "This Month":
+        start = today.replace(day=1)
+    elif time_range == "This Quarter":
+        start = today.replace(month=3 * ((today.month - 1) // 3) + 1, day=1)
+    else:
+        raise ValueError(f"Unknown time range: {time_range}")
+    return start, today + timedelta(days=1)
+
+
+def format_top_products(frame: pd.DataFrame) -> pd.DataFrame:
+    """Display strings for a top_products table (its columns stay numeric until rendered)"""
+    return pd.DataFrame({
+        "product": frame["product"],
+        "sales": frame["sales"].map("${:,.0f}".format),
+        "units": frame["units"].map("{:,.0f}g".format),
+        "margin": frame["margin"].map("{:.0f}%".format)
+    })
+
+
+def _status(value: float, good: float = 98, fair: float = 95) -> str:
+    return "🟢" if value >= good else "🟡" if value >= fair else "🔴"
+
+
+class SQLSource:
+    """Pooled SQL backend - stdlib sqlite3 for sqlite:/// URLs, SQLAlchemy for anything else"""
+
+    name = "sql"
+    # Identifies the current build of the data when it can be rebuilt wholesale (see SyntheticSource)
+    generation: Optional[str] = None
+
+    def __init__(self, url: str, pool_size: int = 5):
+        self.url = url
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._engine = None
+        self.dialect = "sqlite" if url.startswith("sqlite") else "default"
+        if self.dialect != "sqlite":
+            from sqlalchemy import create_engine
+
+            self._engine = create_engine(url, pool_size=pool_size, pool_pre_ping=True)
+
+    def _sqlite(self) -> sqlite3.Connection:
+        # One connection shared by every thread (queries hold self._lock), like MemorySource
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.url.split("///", 1)[-1] or ":memory:", check_same_thread=False)
+        return self._conn
+
+    def _bind(self, value: Any) -> Any:
+        # Timestamps are compared as ISO text in SQLite
+        return value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) and self.dialect == "sqlite" else value
+
+    def query(self, sql: str, **params) -> pd.DataFrame:
+        """Run a parameterized (:name) query and return the result rows"""
+        params = {key: self._bind(value) for key, value in params.items()}
+        if self._engine is None:
+            with self._lock:
+                return pd.read_sql_query(sql, self._sqlite(), params=params)
+        from sqlalchemy import text
+
+        with self._engine.connect() as conn:
+            return pd.read_sql_query(text(sql), conn, params=params)
+
+    def _day(self, column: str = "ts") -> str:
+        return f"date({column})" if self.dialect == "sqlite" else f"CAST({column} AS DATE)"
+
+    def transactions(self, since: datetime, until: datetime) -> pd.DataFrame:
+        """Transactions in (since, until], pre-aggregated per day for the rollup store"""
+        return self.query(
+            f"SELECT {self._day()} AS ts, SUM(revenue) AS revenue, SUM(cost) AS cost, COUNT(*) AS count "
+            f"FROM transactions WHERE ts > :since AND ts <= :until GROUP BY {self._day()}",
+            since=since, until=until
+        )
+
+    def kpis(self, time_range: str) -> Dict[str, Any]:
+        start, end = time_window(time_range)
+        previous_start = start - (end - start)
+
+        def totals(lower: datetime, upper: datetime) -> Dict[str, Any]:
+            sales = self.query(
+                "SELECT COALESCE(SUM(revenue), 0) AS revenue, COUNT(DISTINCT customer_id) AS customers "
+                "FROM transactions WHERE ts >= :start AND ts < :end",
+                start=lower, end=upper
+            ).iloc[0]
+            production = self.query(
+                "SELECT COALESCE(SUM(kg), 0) AS kg FROM production WHERE ts >= :start AND ts < :end",
+                start=lower, end=upper
+            ).iloc[0]
+            return {
+                "revenue": int(sales["revenue"]),
+                "production": float(production["kg"]),
+                "customers": int(sales["customers"])
+            }
+
+        current, previous = totals(start, end), totals(previous_start, start)
+        compliance = self.query("SELECT COALESCE(AVG(score), 0) AS score FROM compliance_areas").iloc[0]
+        # Compliance areas only hold current scores, so that KPI has no delta
+        return dict(
+            current,
+            production_delta=f"{current['production'] - previous['production']:+.1f} kg",
+            customers_delta=f"{current['customers'] - previous['customers']:+,}",
+            compliance_score=int(round(compliance["score"]))
+        )
+
+    def key_metrics(self, time_range: str) -> List[Tuple[str, str, str]]:
+        start, end = time_window(time_range)
+        row = self.query(
+            "SELECT COUNT(*) AS orders, COUNT(DISTINCT customer_id) AS customers, "
+            "COALESCE(AVG(revenue), 0) AS average_order, COALESCE(SUM(grams), 0) AS grams, "
+            "COALESCE(SUM(revenue), 0) AS revenue, COALESCE(SUM(cost), 0) AS cost "
+            "FROM transactions WHERE ts >= :start AND ts < :end",
+            start=start, end=end
+        ).iloc[0]
+        margin = 100 * (row["revenue"] - row["cost"]) / row["revenue"] if row["revenue"] else 0
+        return [
+            ("Orders", f"{int(row['orders']):,}", "🟢"),
+            ("Active Customers", f"{int(row['customers']):,}", "🟢"),
+            ("Average Order", f"${row['average_order']:,.0f}", "🟢"),
+            ("Grams Sold", f"{row['grams']:,.0f}g", "🟢"),
+            ("Gross Margin", f"{margin:.1f}%", _status(margin, 35, 30))
+        ]
+
+    def top_products(self, time_range: str) -> pd.DataFrame:
+        start, end = time_window(time_range)
+        frame = self.query(
+            "SELECT product, SUM(revenue) AS sales, SUM(grams) AS units, SUM(cost) AS cost "
+            "FROM transactions WHERE ts >= :start AND ts < :end "
+            "GROUP BY product ORDER BY sales DESC LIMIT 10",
+            start=start, end=end
+        )
+        margin = 100 * (frame["sales"] - frame["cost"]) / frame["sales"].where(frame["sales"] != 0)
+        return pd.DataFrame({
+            "product": frame["product"],
+            "sales": frame["sales"].astype(float),
+            "units": frame["units"].astype(float),
+            "margin": margin.fillna(0).astype(float)
+        })
+
+    def operations_status(self, time_range: str) -> List[Tuple[str, int, str]]:
+        frame = self.query("SELECT name, efficiency, status FROM operations ORDER BY name")
+        return [(row.name, int(row.efficiency), row.status) for row in frame.itertuples(index=False)]
+
+    def pipeline(self, time_range: str) -> pd.DataFrame:
+        start, end = time_window(time_range)
+        frame = self.query(
+            "SELECT stage, SUM(units) AS units FROM production WHERE ts >= :start AND ts < :end GROUP BY stage",
+            start=start, end=end
+        ).set_index("stage").reindex(PIPELINE_STAGES, fill_value=0)
+        units = frame["units"].astype(int)
+        # A stage is flagged when it lost more than 3% of the previous stage's units
+        yield_ratio = (units / units.shift(1)).fillna(1.0)
+        return pd.DataFrame({
+            "Stage": PIPELINE_STAGES,
+            "Units": units.values,
+            "Status": ["🟢" if ratio >= 0.97 else "🟡" for ratio in yield_ratio]
+        })
+
+    def financial_metrics(self, time_range: str) -> List[List[Tuple[str, str, Optional[str]]]]:
+        start, end = time_window(time_range)
+        previous_start = start - (end - start)
+
+        def totals(lower: datetime, upper: datetime) -> Tuple[float, float]:
+            row = self.query(
+                "SELECT COALESCE(SUM(revenue), 0) AS revenue, COALESCE(SUM(cost), 0) AS cost "
+                "FROM transactions WHERE ts >= :start AND ts < :end",
+                start=lower, end=upper
+            ).iloc[0]
+            return float(row["revenue"]), float(row["cost"])
+
+        def delta(current: float, previous: float) -> Optional[str]:
+            return f"{100 * (current - previous) / abs(previous):.1f}%" if previous else None
+
+        revenue, cost = totals(start, end)
+        previous_revenue, previous_cost = totals(previous_start, start)
+        profit, previous_profit = revenue - cost, previous_revenue - previous_cost
+        tax_rate = float(os.getenv("ZEC_RATE", "4")) / 100
+        margin = 100 * profit / revenue if revenue else 0.0
+        previous_margin = 100 * previous_profit / previous_revenue if previous_revenue else 0.0
+        return [
+            [("Gross Revenue", f"${revenue:,.0f}", delta(revenue, previous_revenue)),
+             ("Net Profit", f"${profit:,.0f}", delta(profit, previous_profit))],
+            [("Operating Expenses", f"${cost:,.0f}", delta(cost, previous_cost)),
+             ("Tax Liability", f"${max(profit, 0) * tax_rate:,.0f}",
+              delta(max(profit, 0), max(previous_profit, 0)))],
+            [("Cash Flow", f"{'+' if profit >= 0 else '-'}${abs(profit):,.0f}", delta(profit, previous_profit)),
+             ("Margin", f"{margin:.1f}%", f"{margin - previous_margin:.1f}%")]
+        ]
+
+    def compliance_areas(self, time_range: str) -> List[Tuple[str, int]]:
+        frame = self.query("SELECT area, score FROM compliance_areas ORDER BY area")
+        return [(row.area, int(row.score)) for row in frame.itertuples(index=False)]
+
+    def compliance_events(self, time_range: str) -> pd.DataFrame:
+        return self.query(
+            "SELECT date, event, status FROM compliance_events WHERE date >= :today ORDER BY date",
+            today=datetime.now().strftime("%Y-%m-%d")
+        )
+
+
+class MemorySource(SQLSource):
+    """SQL backend over one shared in-memory SQLite database filled from DataFrames"""
+
+    TABLES = ("transactions", "production", "operations", "compliance_areas", "compliance_events")
+
+    def __init__(self):
+        self.url = "sqlite:///:memory:"
+        self.dialect = "sqlite"
+        self._engine = None
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _load(self, table: str, frame: pd.DataFrame) -> None:
+        frame = frame.copy()
+        if "ts" in frame:
+            frame["ts"] = pd.to_datetime(frame["ts"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+        frame.to_sql(table, self._conn, if_exists="replace", index=False)
+        if "ts" in frame:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts)")
+
+    def _refresh(self) -> None:
+        pass
+
+    def query(self, sql: str, **params) -> pd.DataFrame:
+        params = {key: self._bind(value) for key, value in params.items()}
+        with self._lock:
+            self._refresh()
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+
+class SyntheticSource(MemorySource):
+    """Bulletproof demo data - always available, no external dependencies
+
+    Tables come from ``dashboard.synthetic`` (SYNTHETIC_SEED, SYNTHETIC_DAYS,
+    SYNTHETIC_ORDERS_PER_DAY) and are answered by the same SQL as a real
+    database. Whole days are generated once per calendar day; rows later than
+    the current time stay hidden behind views until their time comes. Each day's
+    data is a new ``generation``, so rollups built from the previous one are reset.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: Optional[int] = None, days: Optional[int] = None,
+                 orders_per_day: Optional[float] = None):
+        super().__init__()
+        self.seed = seed if seed is not None else int(os.getenv("SYNTHETIC_SEED", "0"))
+        self.days = days or int(os.getenv("SYNTHETIC_DAYS", "400"))
+        self.orders_per_day = orders_per_day or float(os.getenv("SYNTHETIC_ORDERS_PER_DAY", "60"))
+        self._generated_for: Optional[str] = None
+
+    @property
+    def generation(self) -> Optional[str]:
+        """Day the current data was generated for (regenerating first if it is a new day)"""
+        with self._lock:
+            self._refresh()
+            return f"synthetic:{self.seed}:{self.days}:{self.orders_per_day:g}:{self._generated_for}"
+
+    def _refresh(self) -> None:
+        today = datetime.now().strftime("%Y-%m-%d")
+        if self._generated_for == today:
+            return
+        from .synthetic import generate
+
+        data = generate(self.seed, self.days, self.orders_per_day)
+        for table in self.TABLES:
+            if table in ("transactions", "production"):
+                self._conn.execute(f"DROP VIEW IF EXISTS {table}")
+                self._load(f"{table}_all", data[table])
+                self._conn.execute(
+                    f"CREATE VIEW {table} AS SELECT * FROM {table}_all WHERE ts <= datetime('now', 'localtime')"
+                )
+            else:
+                self._load(table, data[table])
+        self._generated_for = today
+
+
+class FileSource(MemorySource):
+    """CSV/Parquet backend - ``<data_dir>/<table>.parquet`` or ``.csv`` loaded into in-memory SQLite
+
+    Tables are reloaded only when their file changes, so queries reuse the SQL backend.
+    """
+
+    name = "files"
+
+    def __init__(self, data_dir: str):
+        super().__init__()
+        self.data_dir = data_dir
+        self._loaded: Dict[str, float] = {}
+
+    def _path(self, table: str) -> Optional[str]:
+        for extension in (".parquet", ".csv"):
+            path = os.path.join(self.data_dir, table + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _refresh(self) -> None:
+        for table in self.TABLES:
+            path = self._path(table)
+            if path is None:
+                continue
+            mtime = os.path.getmtime(path)
+            if self._loaded.get(table) == mtime:
+                continue
+            self._load(table, pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path))
+            self._loaded[table] = mtime
+
+
+class FallbackSource:
+    """Serve from ``primary`` and fall back to ``fallback`` whenever a query fails
+
+    Raw transactions never fall back: synthetic rows must not leak into real rollups.
+    The fallback is only touched when a query fails (building synthetic data is
+    not free), and ``degraded()`` lists the queries currently served from it.
+    """
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = primary.name
+        self._lock = threading.Lock()
+        self._failing: Set[str] = set()
+
+    def degraded(self) -> List[str]:
+        """Queries whose last call failed on the primary and was answered by the fallback"""
+        with self._lock:
+            return sorted(self._failing)
+
+    def __getattr__(self, attribute: str):
+        primary = getattr(self.primary, attribute)
+        if not callable(primary) or attribute == "transactions":
+            return primary
+
+        def call(*args, **kwargs):
+            try:
+                value = primary(*args, **kwargs)
+            except Exception:
+                logger.exception("%s source failed on %s, using %s data", self.primary.name, attribute, self.fallback.name)
+                with self._lock:
+                    self._failing.add(attribute)
+                return getattr(self.fallback, attribute)(*args, **kwargs)
+            with self._lock:
+                self._failing.discard(attribute)
+            return value
+
+        return call
+
+
+def get_source(database_url: Optional[str] = None, data_dir: Optional[str] = None):
+    """Pick the backend: DATABASE_URL (SQL), then DATA_DIR (files), then synthetic data"""
+    database_url = database_url or os.getenv("DATABASE_URL")
+    data_dir = data_dir or os.getenv("DATA_DIR")
+    synthetic = SyntheticSource()
+    try:
+        if database_url:
+            return FallbackSource(SQLSource(database_url, int(os.getenv("DATABASE_POOL_SIZE", "5"))), synthetic)
+        if data_dir:
+            return FallbackSource(FileSource(data_dir), synthetic)
+    except Exception:
+        logger.exception("Data source unavailable, using synthetic data")
+    return synthetic
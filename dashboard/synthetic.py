@@ -0,0 +1,236 @@
+"""Synthetic operations data - seedable, internally consistent demo datasets built with NumPy
+
+``generate`` builds every table with array operations, looping only over days
+where production and stock depend on the day before. The same seed, start day
+and sizes always give the same rows, and tables agree with each other:
+    - sold grams come from the finished production that stocked inventory
+    - production is planned against sales, so stock stays near two weeks of cover
+    - pipeline stages only ever lose units
+    - statuses follow the scores they describe
+
+    data = generate(seed=7, days=365, orders_per_day=50_000)   # ~18M transactions
+    data["transactions"].groupby("product")["revenue"].sum()
+
+Tables match the SQL schema in ``dashboard.sources`` (transactions, production,
+operations, compliance_areas, compliance_events). Two extra tables come with it:
+``inventory`` (daily stock per product) and ``compliance_scores`` (daily score
+per area).
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .sources import OPERATIONS, PIPELINE_STAGES
+
+# Product: (share of orders, price per gram, cost ratio)
+PRODUCTS = {
+    "Blue Dream Premium": (0.24, 25.0, 0.62),
+    "OG Kush Special": (0.20, 25.0, 0.65),
+    "White Widow Elite": (0.18, 25.0, 0.58),
+    "Green Crack Gold": (0.16, 25.0, 0.67),
+    "Northern Lights Reserve": (0.12, 27.0, 0.60),
+    "Sour Diesel Select": (0.10, 23.0, 0.66),
+}
+
+COMPLIANCE_AREAS = {
+    "🏭 Cultivation License": 99.5,
+    "🧪 Lab Testing & QA": 98.0,
+    "📦 Packaging & Labeling": 99.0,
+    "🚛 Transportation & Delivery": 96.0,
+    "💰 Tax & Financial Compliance": 99.5,
+    "🔒 Security & Surveillance": 97.5,
+    "📋 Record Keeping": 99.0,
+    "👥 Employee Training": 95.0,
+}
+
+# Event name, days from the start of the last generated day, status
+COMPLIANCE_EVENTS = (
+    ("Monthly Inventory Audit", 5, "Scheduled"),
+    ("Employee Safety Training", 12, "Pending"),
+    ("State Inspection", 26, "Confirmed"),
+    ("Quarterly Tax Filing", 41, "Upcoming"),
+)
+
+# Order volume by weekday (Monday first)
+WEEKDAY_FACTORS = np.array([0.85, 0.9, 0.95, 1.0, 1.15, 1.25, 0.9])
+
+# Finished weight of one packaged unit, and the stock production aims to keep (days of recent sales)
+GRAMS_PER_UNIT = 3.5
+COVER_DAYS = 14
+
+
+def _day_offsets(rng: np.random.Generator, counts: np.ndarray) -> np.ndarray:
+    """Day index repeated once per event, plus a random time of day in seconds"""
+    days = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    return days * 86400 + rng.integers(0, 86400, size=len(days))
+
+
+def _recent_sales(sold: np.ndarray) -> np.ndarray:
+    """Average daily sales over the previous seven days, for each day (the first week uses its own average)"""
+    padded = np.concatenate([np.repeat(sold[:7].mean(axis=0, keepdims=True), 7, axis=0), sold])
+    cumulative = np.concatenate([np.zeros_like(padded[:1]), np.cumsum(padded, axis=0)])
+    return (cumulative[7:-1] - cumulative[:-8]) / 7
+
+
+def daily_sales(orders: pd.DataFrame, start: datetime, days: int) -> np.ndarray:
+    """Grams sold per day and product, shaped (days, products)"""
+    sold_day = (orders["ts"].values.astype("datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    return np.bincount(
+        sold_day * len(PRODUCTS) + orders["product"].cat.codes.values,
+        weights=orders["grams"].values, minlength=days * len(PRODUCTS)
+    )[:days * len(PRODUCTS)].reshape(days, len(PRODUCTS))
+
+
+def transactions(rng: np.random.Generator, start: datetime, days: int, orders_per_day: float,
+                 customers: int = 1500, growth: float = 0.1) -> pd.DataFrame:
+    """Orders (ts, product, customer_id, revenue, cost, grams) sorted by time
+
+    Daily volume follows the weekday pattern and grows by ``growth`` per year.
+    Order size is log-normal and customers are skewed towards repeat buyers.
+    """
+    weekdays = (np.arange(days) + start.weekday()) % 7
+    expected = orders_per_day * WEEKDAY_FACTORS[weekdays] * (1 + growth * np.arange(days) / 365)
+    counts = rng.poisson(expected)
+    seconds = np.sort(_day_offsets(rng, counts))
+    size = len(seconds)
+
+    names = list(PRODUCTS)
+    shares, prices, cost_ratios = (np.array(column) for column in zip(*PRODUCTS.values()))
+    product = rng.choice(len(names), size=size, p=shares / shares.sum())
+    grams = np.round(rng.lognormal(np.log(5.5), 0.35, size), 1).astype(np.float32)
+    revenue = (grams * prices[product] * rng.uniform(0.95, 1.05, size)).astype(np.float32)
+    cost = (revenue * cost_ratios[product] * rng.uniform(0.97, 1.03, size)).astype(np.float32)
+
+    return pd.DataFrame({
+        "ts": np.datetime64(start, "s") + seconds.astype("timedelta64[s]"),
+        "product": pd.Categorical.from_codes(product, names),
+        "customer_id": (customers * rng.random(size) ** 2).astype(np.int32),
+        "revenue": revenue,
+        "cost": cost,
+        "grams": grams,
+    })
+
+
+def production(rng: np.random.Generator, start: datetime, days: int, demand_g: np.ndarray) -> pd.DataFrame:
+    """Batches moving through PIPELINE_STAGES (batch_id, ts, stage, units, kg)
+
+    Each day starts enough batches to replace the last week's average sales
+    (``demand_g`` is grams sold per day) and close a seventh of the gap to
+    COVER_DAYS of stock, so inventory stays bounded at any order volume. Each
+    stage keeps 95-100% of the previous stage's units and runs two hours after
+    it. ``kg`` is finished product weight and is only set on the last stage, so
+    summing it over any window counts each batch once.
+    """
+    stages = len(PIPELINE_STAGES)
+    recent = _recent_sales(demand_g)
+    batch_g = 110 * (60 / 61) ** (stages - 1) * GRAMS_PER_UNIT  # expected finished grams per batch
+    stock = recent[0] * COVER_DAYS
+    counts = np.zeros(days, dtype=np.int64)
+    planned = []
+    for day in range(days):
+        wanted = max(0.0, recent[day] + (recent[day] * COVER_DAYS - stock) / 7)
+        counts[day] = rng.poisson(wanted / batch_g)
+        yields = rng.beta(60, 1, size=(counts[day], stages))
+        yields[:, 0] = 1.0
+        units = np.floor(rng.normal(110, 10, counts[day])[:, None] * np.cumprod(yields, axis=1)).astype(np.int32)
+        stock += units[:, -1].sum() * GRAMS_PER_UNIT - demand_g[day]
+        planned.append(units)
+
+    units = np.concatenate(planned) if planned else np.zeros((0, stages), dtype=np.int32)
+    started = _day_offsets(rng, counts)
+    batches = len(started)
+    seconds = started[:, None] + np.arange(stages) * 7200
+    kg = np.zeros((batches, stages), dtype=np.float32)
+    kg[:, -1] = units[:, -1] * GRAMS_PER_UNIT / 1000
+
+    return pd.DataFrame({
+        "batch_id": np.repeat(np.arange(batches, dtype=np.int32), stages),
+        "ts": np.datetime64(start, "s") + seconds.ravel().astype("timedelta64[s]"),
+        "stage": pd.Categorical.from_codes(np.tile(np.arange(stages), batches), PIPELINE_STAGES),
+        "units": units.ravel(),
+        "kg": kg.ravel(),
+    }).sort_values("ts", kind="stable", ignore_index=True)
+
+
+def inventory(orders: pd.DataFrame, batches: pd.DataFrame, start: datetime, days: int) -> pd.DataFrame:
+    """Daily stock per product (date, product, received_g, sold_g, on_hand_g)
+
+    Each product opens with COVER_DAYS of its first week's sales. Finished
+    production is split across products by how far each is below COVER_DAYS of
+    its recent sales (by order share when none is), which keeps every product
+    stocked rather than just the total.
+    """
+    names = list(PRODUCTS)
+    shares = np.array([share for share, _, _ in PRODUCTS.values()])
+    shares = shares / shares.sum()
+    origin = np.datetime64(start, "D")
+
+    finished = batches[batches["kg"] > 0]
+    received_day = (finished["ts"].values.astype("datetime64[D]") - origin).astype(np.int64)
+    finished_g = np.bincount(received_day, weights=finished["kg"].values * 1000, minlength=days)[:days]
+    sold = daily_sales(orders, start, days)
+
+    target = _recent_sales(sold) * COVER_DAYS
+    stock = target[0].copy()
+    received, on_hand = np.zeros_like(sold), np.zeros_like(sold)
+    for day in range(days):
+        need = np.maximum(target[day] - stock, 0)
+        received[day] = finished_g[day] * (need / need.sum() if need.any() else shares)
+        stock += received[day] - sold[day]
+        on_hand[day] = stock
+
+    return pd.DataFrame({
+        "date": np.repeat(origin + np.arange(days), len(names)),
+        "product": pd.Categorical.from_codes(np.tile(np.arange(len(names)), days), names),
+        "received_g": received.ravel().astype(np.float32),
+        "sold_g": sold.ravel().astype(np.float32),
+        "on_hand_g": on_hand.ravel().astype(np.float32),
+    })
+
+
+def compliance_scores(rng: np.random.Generator, start: datetime, days: int) -> pd.DataFrame:
+    """Daily score per compliance area (date, area, score): mean-reverting noise around each area's baseline"""
+    areas = list(COMPLIANCE_AREAS)
+    baseline = np.array(list(COMPLIANCE_AREAS.values()))
+    noise = pd.DataFrame(rng.normal(0, 1, size=(days, len(areas))))
+    drift = noise.ewm(alpha=0.15).mean().values * 4
+    scores = np.clip(np.round(baseline + drift), 80, 100).astype(np.int16)
+    return pd.DataFrame({
+        "date": np.repeat(np.datetime64(start, "D") + np.arange(days), len(areas)),
+        "area": np.tile(areas, days),
+        "score": scores.ravel(),
+    })
+
+
+def operations(rng: np.random.Generator) -> pd.DataFrame:
+    """Current efficiency per operation (name, efficiency, status); status follows efficiency"""
+    efficiency = np.clip(np.round(rng.normal(97, 2, len(OPERATIONS))), 88, 100).astype(np.int16)
+    status = np.where(efficiency >= 98, "🟢 Online", np.where(efficiency >= 95, "🟡 Monitoring", "🔴 Alert"))
+    return pd.DataFrame({"name": OPERATIONS, "efficiency": efficiency, "status": status})
+
+
+def generate(seed: int = 0, days: int = 400, orders_per_day: float = 60, end: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+    """Every synthetic table for ``days`` whole days ending with the day of ``end`` (default today)"""
+    end = end or datetime.now()
+    last_day = datetime(end.year, end.month, end.day)
+    start = last_day - timedelta(days=days - 1)
+    rng = np.random.default_rng(seed)
+
+    orders = transactions(rng, start, days, orders_per_day)
+    batches = production(rng, start, days, daily_sales(orders, start, days).sum(axis=1))
+    scores = compliance_scores(rng, start, days)
+    current = scores[scores["date"] == scores["date"].max()]
+    return {
+        "transactions": orders,
+        "production": batches,
+        "inventory": inventory(orders, batches, start, days),
+        "compliance_scores": scores,
+        "operations": operations(rng),
+        "compliance_areas": pd.DataFrame({"area": current["area"].values, "score": current["score"].values}),
+        "compliance_events": pd.DataFrame([
+            {"date": (last_day + timedelta(days=offset)).strftime("%Y-%m-%d"), "event": event, "status": status}
+            for event, offset, status in COMPLIANCE_EVENTS
+        ]),
+    }
@@ -9,9 +9,20 @@ Built for: ZAKIBAYDOUN (Cannabis Tech Entrepreneur)
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import random
-from datetime import datetime, timedelta
+import os
+import math
+import time
+import uuid
+from datetime import datetime, date, timedelta
+from agents import jobs, metrics
+from agents import session as sessions
+from agents.audit import EvidenceIndex
+from agents.limiter import use_tenant
+from agents.resilience import breaker_states
+from agents.tokens import use_session, usage_totals
+from dashboard.sources import OPERATIONS, format_top_products, get_source
+from dashboard import rollups, snapshots
+from dashboard.alerts import AlertBus, AlertStore, check_source
 
 st.set_page_config(
     page_title="🎮 Ground Control",
@@ -20,12 +31,372 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Operations data
-OPERATIONS = [
-    "Production Planning", "Quality Control", "Inventory Management", "Sales Analytics",
-    "Compliance Monitoring", "Supply Chain", "Customer Service", "Financial Tracking"
+# How long dashboard data stays fresh for each time range (seconds)
+TIME_RANGE_TTL = {"Today": 60, "This Week": 300, "This Month": 900, "This Quarter": 3600}
+
+def cache_bucket(time_range):
+    """Cache generation for a time range - rolls over once its TTL has elapsed"""
+    return int(time.time() // TIME_RANGE_TTL[time_range])
+
+def secret(name):
+    """Value from Streamlit secrets, falling back to the environment"""
+    try:
+        return st.secrets.get(name) or os.getenv(name)
+    except Exception:
+        return os.getenv(name)
+
+@st.cache_resource
+def get_data_source():
+    """One data source (and connection pool) per process"""
+    return get_source(database_url=secret("DATABASE_URL"), data_dir=secret("DATA_DIR"))
+
+@st.cache_resource
+def get_rollups():
+    """Revenue/expense/profit rollups shared by every session (ROLLUP_DB persists them)"""
+    return rollups.RollupStore(secret("ROLLUP_DB") or ":memory:")
+
+@st.cache_resource
+def get_session_store():
+    """Digital Twin sessions shared by every browser session (AGENTS_SESSION_DB persists them)"""
+    return sessions.get_store(secret("AGENTS_SESSION_DB"))
+
+def sync_rollups(force=False):
+    """Fold new transactions into the rollups - at most once a minute per process unless forced"""
+    try:
+        get_rollups().sync(get_data_source(), min_interval=0 if force else 60)
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Rollups not updated: {e}")
+
+# Rows per page for tables that can grow to hundreds of rows
+PAGE_SIZE = 50
+
+def health(scores):
+    """🟢 / 🟡 / 🔴 for scores of at least 98, at least 95, and below"""
+    return pd.cut(scores, [-math.inf, 95, 98, math.inf], right=False, labels=["🔴", "🟡", "🟢"]).astype(str)
+
+def paginate(frame, key):
+    """Current page of a frame - a page picker appears once it has more than PAGE_SIZE rows"""
+    pages = math.ceil(len(frame) / PAGE_SIZE)
+    if pages <= 1:
+        return frame
+    page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, value=1, key=key)
+    return frame.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+def render_table(frame, key, column_config=None):
+    """One paginated dataframe render for a whole table"""
+    st.dataframe(
+        paginate(frame, key),
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config
+    )
+
+# Data loaders - cached across reruns, keyed by time range and cache bucket
+@st.cache_data(ttl=3600, max_entries=64)
+def load_kpis(time_range, bucket):
+    return snapshots.kpis(get_data_source(), get_rollups(), time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_revenue_trend(time_range, bucket):
+    return rollups.revenue_trend(get_rollups(), time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_key_metrics(time_range, bucket):
+    return snapshots.key_metrics(get_data_source(), time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_top_products(time_range, bucket):
+    return get_data_source().top_products(time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_operations_status(time_range, bucket):
+    frame = pd.DataFrame(get_data_source().operations_status(time_range), columns=["Operation", "Efficiency", "Status"])
+    frame.insert(2, "Health", health(frame["Efficiency"]))
+    return frame
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_pipeline(time_range, bucket):
+    return get_data_source().pipeline(time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_financial_metrics(time_range, bucket):
+    return get_data_source().financial_metrics(time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_financial_trend(time_range, bucket):
+    return rollups.financial_trend(get_rollups(), time_range)
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_compliance_areas(time_range, bucket):
+    frame = pd.DataFrame(get_data_source().compliance_areas(time_range), columns=["Area", "Score"])
+    frame["Health"] = health(frame["Score"])
+    return frame
+
+@st.cache_data(ttl=3600, max_entries=64)
+def load_compliance_events(time_range, bucket):
+    return get_data_source().compliance_events(time_range)
+
+DATA_LOADERS = [
+    load_kpis, load_revenue_trend, load_key_metrics, load_top_products, load_operations_status,
+    load_pipeline, load_financial_metrics, load_financial_trend, load_compliance_areas,
+    load_compliance_events
 ]
 
+def refresh_data():
+    """Drop every cached dashboard frame so the next run regenerates them"""
+    for loader in DATA_LOADERS:
+        loader.clear()
+    sync_rollups(force=True)
+    builder = get_snapshot_builder()
+    if builder is not None:
+        builder.request()
+
+@st.cache_resource
+def get_snapshot_builder():
+    """Executive Summary snapshots rebuilt in the background (SNAPSHOT_DIR) - None when not configured"""
+    directory = secret("SNAPSHOT_DIR")
+    if not directory:
+        return None
+    interval = float(secret("SNAPSHOT_INTERVAL") or 60)
+    return snapshots.SnapshotBuilder(directory, get_data_source(), get_rollups(), interval).start()
+
+def load_snapshot(time_range):
+    """Memory-mapped Executive Summary snapshot - a stale one is still served while it is rebuilt"""
+    builder = get_snapshot_builder()
+    if builder is None:
+        return None
+    snapshot = snapshots.load(builder.directory, time_range, max_age=TIME_RANGE_TTL[time_range])
+    if snapshot is None or snapshot["stale"]:
+        builder.request(time_range)
+    return snapshot
+
+# Alert feed polling interval (seconds) and number of alerts kept on screen
+ALERT_POLL_SECONDS = 5
+ALERT_FEED_SIZE = 20
+
+ALERT_STYLES = {"success": st.success, "warning": st.warning, "error": st.error, "info": st.info}
+
+@st.cache_resource
+def get_alert_bus():
+    """Alert store and publisher shared by every session (ALERTS_DB persists them)"""
+    bus = AlertBus(AlertStore(secret("ALERTS_DB") or ":memory:"))
+    if not bus.store.last_id():
+        bus.publish("info", "Command center online - alert feed started", source="system")
+    return bus
+
+@st.cache_data(ttl=60)
+def check_alerts():
+    """Raise threshold alerts from the data source - at most once a minute per process"""
+    try:
+        return check_source(get_alert_bus(), get_data_source())
+    except Exception as e:
+        st.sidebar.warning(f"⚠️ Alert checks failed: {e}")
+        return 0
+
+@st.fragment(run_every=ALERT_POLL_SECONDS)
+def render_alerts():
+    """Alert feed - reruns on its own every few seconds and only reads alerts newer than the last one seen"""
+    store = get_alert_bus().store
+    last_id = st.session_state.get("alert_last_id")
+    new = store.latest(ALERT_FEED_SIZE) if last_id is None else store.since(last_id)
+    feed = st.session_state.setdefault("alert_feed", [])
+    if new:
+        feed[:0] = reversed(new)
+        del feed[ALERT_FEED_SIZE:]
+    st.session_state["alert_last_id"] = new[-1]["id"] if new else last_id or 0
+    
+    for alert in feed:
+        ALERT_STYLES[alert["level"]](f"**{alert['ts'][11:16]}** - {alert['message']}")
+
+# Agents available in the Digital Twin panel
+TWIN_AGENTS = {
+    "CEO Digital Twin": "ghc_dt", "Finance": "finance", "Strategy": "strategy", "Market": "market",
+    "Risk": "risk", "Compliance": "compliance", "Operations": "operations", "Innovation": "innovation",
+    "Code": "code"
+}
+
+def current_session_id():
+    """Conversation and job owner id - kept in the URL so it survives reruns, reloads and reconnects"""
+    if "session" not in st.query_params:
+        st.query_params["session"] = uuid.uuid4().hex
+    return st.query_params["session"]
+
+def current_tenant():
+    """Rate limit key ``<org>/<user>``: ORG_ID and USER_ID from the secrets, else this session"""
+    return f"{secret('ORG_ID') or 'default'}/{secret('USER_ID') or current_session_id()}"
+
+def render_digital_twin():
+    """Ask the Digital Twin - streams the agent answer as it is generated, within a persistent session"""
+    st.header("🤖 Ask the Digital Twin")
+    
+    session_id = current_session_id()
+    get_session_store()  # open the store from the secrets before the first session is loaded
+    session = sessions.load_session(session_id)
+    if session.summary:
+        st.caption(f"🧠 Earlier: {session.summary}")
+    for turn in session.history:
+        st.chat_message("user").write(turn["question"])
+        st.chat_message("assistant").write(turn["answer"])
+    
+    with st.form("digital_twin"):
+        agent_label = st.selectbox("Agent", list(TWIN_AGENTS))
+        question = st.text_area("Question", placeholder="What is our cash runway at ZEC 4%?")
+        asked = st.form_submit_button("Ask")
+    
+    if asked and question.strip():
+        st.chat_message("user").write(question)
+        with use_session(session_id), use_tenant(current_tenant()):
+            stream = sessions.stream(session, question, TWIN_AGENTS[agent_label])
+            with st.chat_message("assistant"):
+                st.write_stream(stream)
+        meta = stream.meta
+        if meta.get("error"):
+            st.caption(f"⚠️ {meta['error']}")
+        else:
+            st.caption(
+                f"🔢 {meta.get('prompt_tokens', 0):,} prompt + {meta.get('completion_tokens', 0):,} completion tokens"
+                f"{' • cached' if meta.get('cached') else ''}{' • prompt trimmed' if meta.get('trimmed') else ''}"
+            )
+
+# Background job polling interval (seconds) and the analyses that can be queued
+JOB_POLL_SECONDS = 2
+JOB_KINDS = {"Single agent analysis": "agent", "Multi-agent strategy review": "review"}
+JOB_ICONS = {"queued": "⏳", "running": "🔄", "done": "✅", "failed": "❌", "cancelled": "🚫"}
+
+def render_background_jobs():
+    """Queue long analyses to run on background workers - they keep running across reruns and reconnects"""
+    st.header("🧵 Background Analyses")
+    
+    owner = current_session_id()
+    with st.form("background_job"):
+        col1, col2 = st.columns(2)
+        with col1:
+            kind = st.selectbox("Analysis", list(JOB_KINDS))
+        with col2:
+            agent_label = st.selectbox("Agent (single analysis)", list(TWIN_AGENTS))
+        question = st.text_area("Question", placeholder="Full FP&A review for next quarter at ZEC 4%")
+        queued = st.form_submit_button("Queue Analysis")
+    
+    if queued and question.strip():
+        params = {"question": question}
+        if JOB_KINDS[kind] == "agent":
+            params["agent"] = TWIN_AGENTS[agent_label]
+        jobs.submit(JOB_KINDS[kind], owner=owner, tenant=current_tenant(), **params)
+    
+    render_job_list(owner)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_list(owner):
+    """This session's jobs - polls the job store on its own without rerunning the page"""
+    recent = jobs.list_jobs(owner=owner, limit=10)
+    if not recent:
+        st.caption("No background analyses yet")
+        return
+    
+    for job in recent:
+        label = job["params"].get("agent", job["kind"])
+        title = f"{JOB_ICONS[job['status']]} {label}: {job['params']['question'][:80]}"
+        with st.expander(title, expanded=job["status"] in ("queued", "running")):
+            if job["status"] in ("queued", "running"):
+                st.progress(job["progress"], text=job["message"] or job["status"].title())
+                if st.button("Cancel", key=f"cancel_{job['id']}"):
+                    jobs.cancel(job["id"])
+            elif job["status"] == "done":
+                st.markdown(job["result"]["answer"])
+                for agent, answer in job["result"].get("answers", {}).items():
+                    st.caption(f"**{agent}**: {answer['answer'][:300]}")
+            else:
+                st.caption(f"{job['status'].title()}: {job['error']}")
+
+@st.cache_resource
+def start_metrics_exporter(port):
+    """Prometheus /metrics endpoint for the agents, once per process"""
+    return metrics.start_http_server(int(port))
+
+def render_system_performance():
+    """Latency, time to first token, error/cache rates and throughput per agent and model"""
+    st.header("📡 System Performance")
+    
+    rows = metrics.snapshot()
+    if not rows:
+        st.info("No agent calls yet - ask the Digital Twin below to start collecting metrics")
+        return
+    
+    performance = pd.DataFrame(rows)
+    performance[["error_rate", "cache_hit_rate"]] *= 100
+    st.dataframe(
+        performance,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "error_rate": st.column_config.NumberColumn("Error Rate", format="%.1f%%"),
+            "cache_hit_rate": st.column_config.NumberColumn("Cache Hit Rate", format="%.1f%%"),
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)"),
+            "p99_ms": st.column_config.NumberColumn("p99 (ms)"),
+            "ttft_p50_ms": st.column_config.NumberColumn("TTFT p50 (ms)"),
+            "ttft_p95_ms": st.column_config.NumberColumn("TTFT p95 (ms)"),
+            "tokens_per_sec": st.column_config.NumberColumn("Tokens/sec")
+        }
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("⏱️ Latency by Agent (ms)")
+        st.bar_chart(performance.groupby("agent")[["p50_ms", "p95_ms", "p99_ms"]].max())
+    with col2:
+        st.subheader("⚡ Tokens per Second")
+        st.bar_chart(performance.groupby("agent")[["tokens_per_sec"]].max())
+    
+    breakers = breaker_states()
+    if breakers:
+        st.subheader("🔌 Circuit Breakers")
+        for model, state in breakers.items():
+            if state == "closed":
+                st.success(f"**{model}** - closed")
+            else:
+                st.error(f"**{model}** - {state.replace('_', ' ')}")
+
+@st.cache_resource
+def get_evidence_index(log_path):
+    """One evidence index per log file, shared across sessions"""
+    return EvidenceIndex(log_path)
+
+def render_audit_trail():
+    """Agent audit trail read from the evidence log index"""
+    st.subheader("🧾 Agent Audit Trail")
+    
+    log_path = os.getenv("GHC_DT_EVIDENCE_LOG")
+    if not log_path:
+        st.info("Evidence log not configured - set GHC_DT_EVIDENCE_LOG to record agent answers")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        agent_label = st.selectbox("Agent", ["All Agents"] + list(TWIN_AGENTS))
+    with col2:
+        keywords = st.text_input("Keywords", placeholder="zec runway")
+    with col3:
+        since = st.date_input("Since", value=date.today() - timedelta(days=90))
+    
+    try:
+        entries = list(get_evidence_index(log_path).query(
+            agent=TWIN_AGENTS.get(agent_label),
+            start=since,
+            keywords=keywords.split(),
+            limit=200,
+            newest_first=True
+        ))
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    
+    if entries:
+        columns = ["timestamp", "agent", "question", "answer", "tokens"]
+        st.dataframe(pd.DataFrame(entries).reindex(columns=columns), use_container_width=True)
+    else:
+        st.caption("No matching agent answers")
+
 def main():
     st.title("🎮 Ground Control")
     st.caption("Cannabis operations command center and business intelligence • Live Dashboard")
@@ -38,36 +409,68 @@ def main():
         
         dashboard_view = st.selectbox(
             "Dashboard View",
-            ["Executive Summary", "Operations", "Financial", "Compliance", "Analytics"]
+            ["Executive Summary", "Operations", "Financial", "Compliance", "Analytics", "System Performance"]
         )
         
-        time_range = st.selectbox("Time Range", ["Today", "This Week", "This Month", "This Quarter"])
+        time_range = st.selectbox("Time Range", list(TIME_RANGE_TTL))
+        
+        if st.button("🔄 Refresh Data", use_container_width=True):
+            refresh_data()
+        
+        st.caption(f"📡 Data source: {get_data_source().name}")
+        # Filled in once this run's queries are done
+        source_notice = st.empty()
         
         st.subheader("🎯 Command Status")
         st.success("🟢 All Systems Go")
         st.metric("Active Operations", len(OPERATIONS))
-        st.metric("Efficiency", "96.8%")
-        st.metric("Profit Margin", "34.2%")
+        totals = metrics.metrics.totals()
+        st.metric(
+            "Agent Success Rate",
+            f"{100 * (1 - totals['errors'] / totals['calls']):.1f}%" if totals["calls"] else "—"
+        )
+        margin_slot = st.empty()
+        
+        usage = usage_totals()
+        if usage:
+            st.subheader("🔢 Agent Tokens")
+            st.dataframe(pd.DataFrame.from_dict(usage, orient="index"), use_container_width=True)
+
+    metrics_port = secret("AGENTS_METRICS_PORT")
+    if metrics_port:
+        start_metrics_exporter(metrics_port)
+
+    sync_rollups()
+    bucket = cache_bucket(time_range)
+    # The landing view reads precomputed snapshots when they are configured
+    snapshot = load_snapshot(time_range) if dashboard_view == "Executive Summary" else None
 
     # Executive KPIs
+    kpis = snapshot["kpis"] if snapshot else load_kpis(time_range, bucket)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        revenue = random.randint(180000, 250000)
-        st.metric("Monthly Revenue", f"${revenue:,}", delta="12.5%")
+        st.metric(f"Revenue ({time_range})", f"${kpis['revenue']:,}", delta=kpis["revenue_delta"])
     with col2:
-        production = random.uniform(220, 280)
-        st.metric("Production (kg)", f"{production:.1f}", delta="8.2 kg")
+        st.metric("Production (kg)", f"{kpis['production']:.1f}", delta=kpis["production_delta"])
     with col3:
-        customers = random.randint(1200, 1800)
-        st.metric("Active Customers", f"{customers:,}", delta="156")
+        st.metric("Active Customers", f"{kpis['customers']:,}", delta=kpis["customers_delta"])
     with col4:
-        compliance_score = random.randint(97, 100)
-        st.metric("Compliance Score", f"{compliance_score}%", delta="2%")
+        st.metric("Compliance Score", f"{kpis['compliance_score']}%")
+    margin_slot.metric("Profit Margin", f"{kpis['margin']:.1f}%" if kpis["margin"] is not None else "—")
 
     if dashboard_view == "Executive Summary":
         # Business overview
         st.header("📊 Business Overview")
+        if snapshot:
+            st.caption(
+                f"⚡ Snapshot built {snapshot['age']:.0f}s ago{' • refreshing' if snapshot['stale'] else ''}"
+            )
+        tables = snapshot["tables"] if snapshot else {
+            "revenue_trend": load_revenue_trend(time_range, bucket),
+            "key_metrics": load_key_metrics(time_range, bucket),
+            "top_products": load_top_products(time_range, bucket)
+        }
         
         # Performance metrics
         col1, col2 = st.columns(2)
@@ -75,43 +478,17 @@ def main():
         with col1:
             st.subheader("💰 Revenue Trends")
             
-            # Generate revenue data
-            dates = pd.date_range(start="2025-07-01", end="2025-08-20", freq="D")
-            revenue_data = pd.DataFrame({
-                "Daily Revenue": np.cumsum(np.random.normal(8000, 1000, len(dates)))
-            }, index=dates)
-            
-            st.line_chart(revenue_data)
+            st.line_chart(tables["revenue_trend"])
         
         with col2:
             st.subheader("🎯 Key Metrics")
             
-            metrics = [
-                ("Customer Acquisition", "89 new", "🟢"),
-                ("Inventory Turnover", "8.2x", "🟢"), 
-                ("Average Order", "$147", "🟡"),
-                ("Return Rate", "2.1%", "🟢"),
-                ("Employee Satisfaction", "94%", "🟢")
-            ]
-            
-            for metric, value, status in metrics:
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"**{metric}:** {value}")
-                with col2:
-                    st.write(status)
+            render_table(tables["key_metrics"], "key_metrics_page")
         
         # Top products
         st.subheader("🏆 Top Performing Products")
         
-        top_products = [
-            {"product": "Blue Dream Premium", "sales": "$34,250", "units": "1,370g", "margin": "38%"},
-            {"product": "OG Kush Special", "sales": "$28,900", "units": "1,156g", "margin": "35%"},
-            {"product": "White Widow Elite", "sales": "$26,100", "units": "1,044g", "margin": "42%"},
-            {"product": "Green Crack Gold", "sales": "$23,800", "units": "952g", "margin": "33%"}
-        ]
-        
-        st.dataframe(pd.DataFrame(top_products), use_container_width=True)
+        st.dataframe(format_top_products(tables["top_products"]), use_container_width=True)
         
     elif dashboard_view == "Operations":
         st.header("⚙️ Operations Dashboard")
@@ -119,65 +496,29 @@ def main():
         # Operations status
         st.subheader("🔧 Operations Status")
         
-        for operation in OPERATIONS:
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                st.write(f"**{operation}**")
-            
-            with col2:
-                efficiency = random.randint(92, 100)
-                if efficiency >= 98:
-                    st.success(f"{efficiency}%")
-                elif efficiency >= 95:
-                    st.warning(f"{efficiency}%") 
-                else:
-                    st.error(f"{efficiency}%")
-            
-            with col3:
-                status = random.choice(["🟢 Online", "🟡 Monitoring", "🔴 Alert"])
-                st.write(status)
+        render_table(load_operations_status(time_range, bucket), "operations_page", {
+            "Efficiency": st.column_config.ProgressColumn("Efficiency", min_value=0, max_value=100, format="%d%%"),
+            "Health": st.column_config.TextColumn("Health", width="small")
+        })
         
         # Production pipeline
         st.subheader("🏭 Production Pipeline")
         
-        pipeline_data = {
-            "Stage": ["Raw Materials", "Processing", "Quality Check", "Packaging", "Distribution", "Retail"],
-            "Units": [450, 425, 410, 398, 385, 370],
-            "Status": ["🟢", "🟢", "🟡", "🟢", "🟢", "🟢"]
-        }
-        
-        st.dataframe(pd.DataFrame(pipeline_data), use_container_width=True)
+        st.dataframe(load_pipeline(time_range, bucket), use_container_width=True)
         
     elif dashboard_view == "Financial":
         st.header("💰 Financial Dashboard")
         
         # Financial metrics
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Gross Revenue", "$247,850", delta="15.2%")
-            st.metric("Net Profit", "$84,729", delta="18.1%")
-        
-        with col2:
-            st.metric("Operating Expenses", "$163,121", delta="12.8%")
-            st.metric("Tax Liability", "$29,842", delta="14.5%")
-        
-        with col3:
-            st.metric("Cash Flow", "+$54,887", delta="22.3%")
-            st.metric("ROI", "34.2%", delta="3.1%")
+        for column, group in zip(st.columns(3), load_financial_metrics(time_range, bucket)):
+            with column:
+                for label, value, delta in group:
+                    st.metric(label, value, delta=delta)
         
         # Financial trends
         st.subheader("📈 Financial Trends")
         
-        dates = pd.date_range(start="2025-06-01", end="2025-08-20", freq="W")
-        financial_data = pd.DataFrame({
-            "Revenue": np.cumsum(np.random.normal(50000, 5000, len(dates))),
-            "Expenses": np.cumsum(np.random.normal(30000, 3000, len(dates))),
-            "Profit": np.cumsum(np.random.normal(20000, 2000, len(dates)))
-        }, index=dates)
-        
-        st.line_chart(financial_data)
+        st.line_chart(load_financial_trend(time_range, bucket))
         
     elif dashboard_view == "Compliance":
         st.header("✅ Compliance Dashboard")
@@ -185,62 +526,33 @@ def main():
         st.success("🌿 **ALL SYSTEMS COMPLIANT** - Meeting all regulatory requirements")
         
         # Compliance areas
-        compliance_areas = [
-            ("🏭 Cultivation License", 100),
-            ("🧪 Lab Testing & QA", 98),
-            ("📦 Packaging & Labeling", 100),
-            ("🚛 Transportation & Delivery", 95),
-            ("💰 Tax & Financial Compliance", 100),
-            ("🔒 Security & Surveillance", 97),
-            ("📋 Record Keeping", 100),
-            ("👥 Employee Training", 94)
-        ]
-        
-        for area, score in compliance_areas:
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.write(f"**{area}**")
-                st.progress(score/100)
-            with col2:
-                if score >= 98:
-                    st.success(f"{score}%")
-                elif score >= 95:
-                    st.warning(f"{score}%")
-                else:
-                    st.error(f"{score}%")
+        render_table(load_compliance_areas(time_range, bucket), "compliance_page", {
+            "Score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%d%%"),
+            "Health": st.column_config.TextColumn("Health", width="small")
+        })
         
         # Upcoming compliance events
         st.subheader("📅 Upcoming Compliance Events")
         
-        events = [
-            {"date": "2025-08-25", "event": "Monthly Inventory Audit", "status": "Scheduled"},
-            {"date": "2025-09-01", "event": "Employee Safety Training", "status": "Pending"},
-            {"date": "2025-09-15", "event": "State Inspection", "status": "Confirmed"},
-            {"date": "2025-09-30", "event": "Quarterly Tax Filing", "status": "Upcoming"}
-        ]
+        st.dataframe(load_compliance_events(time_range, bucket), use_container_width=True)
         
-        st.dataframe(pd.DataFrame(events), use_container_width=True)
+        render_audit_trail()
+        
+    elif dashboard_view == "System Performance":
+        render_system_performance()
+
+    render_digital_twin()
+    render_background_jobs()
 
     # Real-time alerts
     st.header("🚨 Real-time Alerts")
     
-    alerts = [
-        {"time": "14:32", "type": "Info", "message": "Inventory levels optimal across all products"},
-        {"time": "13:45", "type": "Success", "message": "Quality control batch #QC-2025-0820 passed all tests"},
-        {"time": "12:18", "type": "Warning", "message": "High demand detected for Blue Dream - consider restocking"},
-        {"time": "11:02", "type": "Info", "message": "Daily compliance check completed successfully"}
-    ]
-    
-    for alert in alerts:
-        alert_type = alert["type"].lower()
-        if alert_type == "success":
-            st.success(f"**{alert['time']}** - {alert['message']}")
-        elif alert_type == "warning":
-            st.warning(f"**{alert['time']}** - {alert['message']}")
-        elif alert_type == "error":
-            st.error(f"**{alert['time']}** - {alert['message']}")
-        else:
-            st.info(f"**{alert['time']}** - {alert['message']}")
+    check_alerts()
+    render_alerts()
+
+    degraded = getattr(get_data_source(), "degraded", list)()
+    if degraded:
+        source_notice.warning(f"⚠️ {get_data_source().name} source failing - showing synthetic data for: {', '.join(degraded)}")
 
     # Footer
     st.markdown("---")
@@ -0,0 +1,98 @@
+"""Request coalescing: callers that join an in-flight call share its result"""
+import asyncio
+import threading
+
+import pytest
+
+from agents.limiter import SingleFlight
+
+
+def test_joined_callers_share_one_call():
+    flights, calls = SingleFlight(), []
+    release = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        release.wait(1)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", upstream))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(joined for _, joined in results) == [False, True, True]
+    assert {value for value, _ in results} == {"answer"}
+
+
+def test_async_joined_callers_share_one_call():
+    flights, calls = SingleFlight(), []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("key", upstream) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [joined for _, joined in results] == [False, True, True]
+
+
+def test_cancelled_leader_does_not_cancel_joiners():
+    flights = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.3)
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(asyncio.wait_for(flights.ado("key", upstream), 0.1))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(asyncio.wait_for(flights.ado("key", upstream), 5))
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return await joiner
+
+    assert asyncio.run(main()) == ("answer", True)
+
+
+def test_abandoned_call_is_cancelled_and_not_joined():
+    flights, started, cancelled = SingleFlight(), [], []
+
+    async def upstream():
+        started.append(1)
+        try:
+            await asyncio.sleep(0.3)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "answer"
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flights.ado("key", upstream), 0.05)
+        await asyncio.sleep(0)
+        return await flights.ado("key", upstream)
+
+    assert asyncio.run(main()) == ("answer", False)
+    assert len(started) == 2
+    assert cancelled == [1]
+
+
+def test_async_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("key", upstream) for _ in range(2)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
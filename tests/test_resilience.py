@@ -0,0 +1,242 @@
+"""Call pipeline against the fake OpenAI server: retries, deadlines, hedging and the circuit breaker"""
+import json
+import time
+import asyncio
+import urllib.error
+import urllib.request
+
+import pytest
+
+from agents import resilience
+from tools.mock_openai import serve
+
+MODEL = "mock-model"
+
+
+class APIStatusError(Exception):
+    """Stands in for the OpenAI SDK's status errors, which carry ``status_code``"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = serve()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def settings(server, monkeypatch):
+    for name in ("AGENTS_HEDGE_PERCENTILE", "AGENTS_HEDGE_MIN_SAMPLES", "AGENTS_BREAKER_FAILURES",
+                 "AGENTS_BREAKER_RESET"):
+        monkeypatch.delenv(name, raising=False)
+    resilience.reset()
+    server.settings.__init__(latency=0.01)
+    yield server.settings
+    resilience.reset()
+
+
+def attempt_for(server, before=None):
+    """An attempt posting one chat completion to the fake server; ``before(n)`` runs ahead of request n"""
+    calls = []
+
+    def attempt(timeout: float):
+        calls.append(timeout)
+        if before:
+            before(len(calls))
+        body = json.dumps({"model": MODEL, "messages": [{"role": "user", "content": "hi"}]}).encode("utf-8")
+        request = urllib.request.Request(f"{server.url}/chat/completions", data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise APIStatusError(e.code) from None
+
+    return attempt
+
+
+def async_attempt_for(server, before=None):
+    attempt = attempt_for(server, before)
+    return lambda timeout: asyncio.to_thread(attempt, timeout)
+
+
+def open_circuit(monkeypatch, reset: float = 0.05) -> resilience.CircuitBreaker:
+    monkeypatch.setenv("AGENTS_BREAKER_FAILURES", "1")
+    monkeypatch.setenv("AGENTS_BREAKER_RESET", str(reset))
+    circuit = resilience.breaker(MODEL)
+    circuit.failure()
+    assert circuit.state == "open"
+    time.sleep(reset)
+    return circuit
+
+
+def test_success(server, settings):
+    response, info = resilience.call(MODEL, attempt_for(server))
+    assert response["choices"][0]["message"]["content"] == settings.answer
+    assert info == {"attempts": 1, "hedged": False}
+
+
+def test_retries_transient_errors(server, settings):
+    settings.error_rate, settings.error_status = 1.0, 503
+
+    def recover(n):
+        if n == 2:
+            settings.error_rate = 0.0
+
+    response, info = resilience.call(MODEL, attempt_for(server, recover), retries=2, backoff=0.01)
+    assert info["attempts"] == 2
+    assert settings.requests == 2
+
+
+def test_does_not_retry_client_errors(server, settings):
+    settings.error_rate, settings.error_status = 1.0, 400
+    with pytest.raises(APIStatusError):
+        resilience.call(MODEL, attempt_for(server), retries=2, backoff=0.01)
+    assert settings.requests == 1
+
+
+def test_deadline_bounds_slow_calls(server, settings):
+    settings.latency = 1.0
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        resilience.call(MODEL, attempt_for(server), retries=2, backoff=0.01, deadline=0.2)
+    assert time.monotonic() - started < 0.8
+
+
+def test_async_deadline_bounds_slow_calls(server, settings):
+    settings.latency = 1.0
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(resilience.acall(MODEL, async_attempt_for(server), retries=2, backoff=0.01, deadline=0.2))
+    assert time.monotonic() - started < 0.8
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_hedges_slow_attempts(server, settings, monkeypatch, use_async):
+    monkeypatch.setenv("AGENTS_HEDGE_PERCENTILE", "50")
+    monkeypatch.setenv("AGENTS_HEDGE_MIN_SAMPLES", "1")
+    resilience.latencies(MODEL).add(0.05)
+    settings.latency = 1.0
+
+    def speed_up(n):
+        if n == 2:
+            settings.latency = 0.01
+
+    async def timed():
+        # Timed inside the loop: asyncio.run also waits for the losing attempt's worker thread
+        started = time.monotonic()
+        info = (await resilience.acall(MODEL, async_attempt_for(server, speed_up)))[1]
+        return info, time.monotonic() - started
+
+    if use_async:
+        info, elapsed = asyncio.run(timed())
+    else:
+        started = time.monotonic()
+        info = resilience.call(MODEL, attempt_for(server, speed_up))[1]
+        elapsed = time.monotonic() - started
+    assert info["hedged"]
+    assert elapsed < 0.8
+
+
+def test_breaker_opens_and_rejects(server, settings, monkeypatch):
+    monkeypatch.setenv("AGENTS_BREAKER_FAILURES", "2")
+    settings.error_rate, settings.error_status = 1.0, 500
+    with pytest.raises(APIStatusError):
+        resilience.call(MODEL, attempt_for(server), retries=1, backoff=0.01)
+    assert resilience.breaker_states()[MODEL] == "open"
+
+    with pytest.raises(resilience.CircuitOpen):
+        resilience.call(MODEL, attempt_for(server))
+    assert settings.requests == 2
+
+
+def test_successful_trial_closes_circuit(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch)
+    resilience.call(MODEL, attempt_for(server))
+    assert circuit.state == "closed"
+
+
+def test_failed_trial_reopens_circuit(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch, reset=0.5)
+    settings.error_rate, settings.error_status = 1.0, 500
+    with pytest.raises(APIStatusError):
+        resilience.call(MODEL, attempt_for(server), retries=0)
+    assert circuit.state == "open"
+    assert not circuit.allow()
+
+
+def test_client_error_trial_closes_circuit(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch)
+    settings.error_rate, settings.error_status = 1.0, 400
+    with pytest.raises(APIStatusError):
+        resilience.call(MODEL, attempt_for(server))
+    assert circuit.state == "closed"
+
+
+def test_rate_limited_trial_waits_for_next_reset(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch)
+    settings.error_rate, settings.error_status = 1.0, 429
+    with pytest.raises(APIStatusError):
+        resilience.call(MODEL, attempt_for(server), retries=0)
+    assert circuit.state == "open"
+    assert circuit.failures == 1
+    time.sleep(circuit.reset_timeout)
+    assert circuit.allow()
+
+
+def test_cancelled_trial_releases_circuit(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch)
+    settings.latency = 0.5
+
+    async def cancelled():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.acall(MODEL, async_attempt_for(server)), 0.1)
+
+    asyncio.run(cancelled())
+    assert circuit.state == "open"
+    assert circuit.acquire() == "trial"
+
+
+def test_trial_past_deadline_releases_circuit(server, settings, monkeypatch):
+    circuit = open_circuit(monkeypatch)
+    with pytest.raises(TimeoutError):
+        resilience.call(MODEL, attempt_for(server), deadline=0)
+    assert circuit.acquire() == "trial"
+
+
+
+def test_losing_hedge_is_closed(server, settings, monkeypatch):
+    monkeypatch.setenv("AGENTS_HEDGE_PERCENTILE", "50")
+    monkeypatch.setenv("AGENTS_HEDGE_MIN_SAMPLES", "1")
+    resilience.latencies(MODEL).add(0.05)
+    settings.latency = 0.3
+
+    class Stream(dict):
+        """A response holding a connection until closed, like a streamed completion"""
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def speed_up(n):
+        if n == 2:
+            settings.latency = 0.01
+
+    post, streams = attempt_for(server, speed_up), []
+
+    def attempt(timeout):
+        stream = Stream(post(timeout))
+        streams.append(stream)
+        return stream
+
+    response, info = resilience.call(MODEL, attempt)
+    assert info["hedged"]
+    deadline = time.monotonic() + 2
+    while not (len(streams) == 2 and streams[-1].closed) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert [stream.closed for stream in streams] == [False, True]
+    assert streams[0] is response
@@ -0,0 +1,167 @@
+"""Fake OpenAI-compatible chat completions server for exercising the agent call pipeline
+
+Serves POST /v1/chat/completions (plain and streamed) with configurable latency
+and failures. Point the agents at it with::
+
+    python tools/mock_openai.py --port 8089 --latency 0.2 --jitter 0.1 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=test streamlit run streamlit_app.py
+
+or start it in-process with ``serve(port=0)`` and read ``server.url``.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+
+
+class MockSettings:
+    """Behaviour of the fake server; attributes can be changed while it runs"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, slow_rate: float = 0.0,
+                 slow_latency: float = 2.0, error_rate: float = 0.0, error_status: int = 500,
+                 answer: str = "Mock answer from the fake model.", chunk_delay: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.answer = answer
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def delay(self) -> float:
+        if self.slow_rate and random.random() < self.slow_rate:
+            return self.slow_latency
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0.0)
+
+
+def _usage(request: Dict[str, Any], answer: str) -> Dict[str, int]:
+    prompt = sum(len(str(message.get("content", ""))) for message in request.get("messages", [])) // 4 + 1
+    completion = len(answer) // 4 + 1
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    settings: MockSettings
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        settings = self.settings
+        number = settings.count()
+        time.sleep(settings.delay())
+        if settings.error_rate and random.random() < settings.error_rate:
+            self._json(settings.error_status, {"error": {"message": "Mock upstream failure", "type": "server_error"}})
+            return
+
+        model = request.get("model", "gpt-4o-mini")
+        answer = settings.answer
+        usage = _usage(request, answer)
+        completion_id = f"chatcmpl-mock-{number}"
+        if not request.get("stream"):
+            self._json(200, {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        words = answer.split(" ")
+        for index, word in enumerate(words):
+            delta = {"content": word if index == 0 else " " + word}
+            self._event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            if settings.chunk_delay:
+                time.sleep(settings.chunk_delay)
+        self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._event({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _event(self, payload: Dict[str, Any]) -> None:
+        self.wfile.write(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that time out or lose a hedged race hang up mid-response
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, settings: Optional[MockSettings] = None) -> MockServer:
+    """Start the fake server on a background thread; ``port=0`` picks a free port"""
+    handler = type("Handler", (_Handler,), {"settings": settings or MockSettings()})
+    server = MockServer((host, port), handler)
+    server.settings = handler.settings
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds added to the latency")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests that are slow")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="latency of slow requests")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of failed requests")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, MockSettings(
+        latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+        error_rate=args.error_rate, error_status=args.error_status, chunk_delay=args.chunk_delay
+    ))
+    print(f"Mock OpenAI server on {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()